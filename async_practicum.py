@@ -0,0 +1,106 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+
+import homework
+from exceptions import RequestError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONNECTIONS = 10
+DEFAULT_TIMEOUT = 10.0
+STREAMS_PER_CONNECTION = 100
+POOL_SIZE = 8
+
+
+class AsyncPracticum:
+    """asyncio client of the homework statuses API.
+
+    `get_api_answer` keeps the contract of `homework.get_api_answer`:
+    the same `from_date` request and the same exceptions, so polls of
+    many tenants run in one thread instead of one thread per poll. At
+    most `max_connections` connections are open; with `http2` requests
+    are multiplexed over them (needs `httpx[http2]` and an HTTPS server
+    speaking HTTP/2, otherwise HTTP/1.1 is negotiated).
+
+    Bookkeeping of an httpx pool on every request grows with the square
+    of its connections and with its queue, so connections are split
+    among clients of `POOL_SIZE` and requests beyond what they carry at
+    once wait on a semaphore instead of in a pool queue.
+    """
+
+    def __init__(self, endpoint=None, headers=None, http2=False,
+                 max_connections=DEFAULT_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT):
+        if httpx is None:
+            raise ImportError(
+                'AsyncPracticum needs httpx: pip install "httpx[http2]"'
+            )
+        self.endpoint = endpoint or homework.ENDPOINT
+        self.headers = headers or homework.HEADERS
+        self._slots = asyncio.Semaphore(
+            max_connections * (STREAMS_PER_CONNECTION if http2 else 1)
+        )
+        size = min(max_connections, POOL_SIZE)
+        self._clients = [
+            httpx.AsyncClient(
+                http2=http2,
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=size, max_keepalive_connections=size
+                ),
+            )
+            for _ in range(math.ceil(max_connections / size))
+        ]
+        self._next_client = itertools.cycle(self._clients)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        for client in self._clients:
+            await client.aclose()
+
+    async def get_api_answer(self, timestamp, headers=None):
+        """Statuses changed since `timestamp`, as `homework.get_api_answer`."""
+        started = time.monotonic()
+        logger.debug(f'Send async request. Time: {time.ctime(timestamp)}')
+        try:
+            async with self._slots:
+                response = await next(self._next_client).get(
+                    self.endpoint,
+                    headers=headers or self.headers,
+                    params={'from_date': timestamp},
+                )
+        except httpx.HTTPError as err:
+            raise RequestError(
+                'Problem with Request', latency=time.monotonic() - started
+            ) from err
+        return homework.api_answer(response, time.monotonic() - started)
+
+    async def poll_many(self, timestamps, headers=None):
+        """Answers by tenant of `{tenant: from_date}`, polled concurrently.
+
+        `headers` maps tenants to their own headers. A failed poll gives
+        its exception instead of the answer.
+        """
+        headers = headers or {}
+        tenants = list(timestamps)
+        answers = await asyncio.gather(
+            *(
+                self.get_api_answer(timestamps[tenant], headers.get(tenant))
+                for tenant in tenants
+            ),
+            return_exceptions=True,
+        )
+        return dict(zip(tenants, answers))
@@ -0,0 +1,366 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+from functools import partial
+from itertools import count
+
+import homework
+
+logger = logging.getLogger(__name__)
+
+HIGH_WATERMARK = 0.8
+MAX_SLOWDOWN = 4
+SUPERSEDED = 'superseded'
+COLLAPSED = 'collapsed'
+REFUSED = 'refused'
+ERROR_KEY = ('error',)
+
+Message = namedtuple('Message', ('tenant', 'key', 'text', 'count'))
+
+
+def collapse_errors(old, new):
+    """Keep one error report with number of occurrences."""
+    if isinstance(new, Message) and new.key == ERROR_KEY:
+        return new._replace(count=old.count + new.count)
+    return new
+
+
+class SheddingQueue:
+    """Bounded FIFO that sheds load instead of growing.
+
+    An item whose key is already queued replaces the queued one in its
+    place: `merge(old, new)` returns what stays, by default the newer
+    item (a superseded status), or combines both (collapsed errors).
+    Nothing else is dropped: a new item waits for room in a full queue
+    up to `timeout` of `put` and is refused after it. Superseded,
+    collapsed and refused items are counted in `stats`.
+    """
+
+    def __init__(self, maxsize, key=None, merge=None):
+        self.maxsize = maxsize
+        self.key = key
+        self.merge = merge
+        self.stats = Counter()
+        self._items = OrderedDict()
+        self._taken = 0
+        self._unique = count()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def fill(self):
+        return len(self._items) / self.maxsize
+
+    def put(self, item, timeout=0):
+        """Queue item, return shed reason if it was not queued as is.
+
+        `timeout` None waits for room until the queue is closed.
+        """
+        key = self.key(item) if self.key else None
+        if key is None:
+            key = (self, next(self._unique))
+        with self._cond:
+            reason = None
+            if key in self._items:
+                merged = (
+                    self.merge(self._items[key], item) if self.merge
+                    else item
+                )
+                reason = SUPERSEDED if merged is item else COLLAPSED
+                item = merged
+            elif not self._cond.wait_for(
+                lambda: len(self._items) < self.maxsize or self._closed,
+                timeout
+            ) or self._closed:
+                reason = REFUSED
+            if reason != REFUSED:
+                self._items[key] = item
+                self._cond.notify_all()
+            if reason:
+                self.stats[reason] += 1
+            return reason
+
+    def get(self, timeout=None):
+        """Oldest item, None when nothing came within timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            self._taken += 1
+            item = self._items.popitem(last=False)[1]
+            self._cond.notify_all()
+            return item
+
+    def task_done(self):
+        """Mark item taken by `get` as processed."""
+        with self._cond:
+            self._taken -= 1
+
+    def idle(self):
+        with self._cond:
+            return not self._items and not self._taken
+
+    def close(self):
+        """Refuse items from now on, wake producers waiting for room."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class Pipeline:
+    """Stages connected with bounded shedding queues.
+
+    Each stage is (name, func, queue). A thread per stage takes items from
+    its queue, `func(item)` returns outputs for the next stage and waits
+    while its queue is full. `submit` refuses an item when the first
+    queue is full. Polling asks `delay()` how long to wait, which grows
+    when any queue is above the high watermark, so overload slows
+    polling down instead of piling up memory.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.processed = Counter()
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(
+                target=self._work, args=(index,), name=f'stage-{name}',
+                daemon=True
+            )
+            for index, (name, _, _) in enumerate(stages)
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def submit(self, item):
+        return self.stages[0][2].put(item)
+
+    def _work(self, index):
+        name, func, stage_queue = self.stages[index]
+        following = (
+            self.stages[index + 1][2] if index + 1 < len(self.stages)
+            else None
+        )
+        while not self._stop.is_set():
+            item = stage_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            try:
+                outputs = func(item) or ()
+            except Exception as error:
+                outputs = ()
+                self.processed[(name, 'failed')] += 1
+                logger.error(f'Stage {name} failed: {error}')
+            else:
+                self.processed[(name, 'done')] += 1
+            if following is not None:
+                for output in outputs:
+                    following.put(output, timeout=None)
+            stage_queue.task_done()
+
+    def pressure(self):
+        """Fill of the fullest queue, from 0 to 1."""
+        return max(stage_queue.fill() for _, _, stage_queue in self.stages)
+
+    def delay(self, base):
+        """Polling pause stretched by pressure above the watermark."""
+        pressure = self.pressure()
+        if pressure < HIGH_WATERMARK:
+            return base
+        excess = (pressure - HIGH_WATERMARK) / (1 - HIGH_WATERMARK)
+        return base * (1 + (MAX_SLOWDOWN - 1) * min(excess, 1))
+
+    def shed(self):
+        """Shed items by stage and reason."""
+        return {
+            (name, reason): number
+            for name, _, stage_queue in self.stages
+            for reason, number in stage_queue.stats.items()
+        }
+
+    def wait_idle(self, timeout=None):
+        """Block until all queues are empty, False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not all(stage_queue.idle() for _, _, stage_queue in self.stages):
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self):
+        self._stop.set()
+        for _, _, stage_queue in self.stages:
+            stage_queue.close()
+        for thread in self._threads:
+            thread.join()
+
+
+def failure(tenant, error):
+    return Message(tenant, ERROR_KEY, f'Сбой в работе программы: {error}', 1)
+
+
+class Delivery:
+    """Answer of a tenant on its way through the pipeline.
+
+    A homework sent is remembered by the cursor, the cursor moves past
+    the answer once all of its homeworks are sent. After a failed one it
+    stays, so the next poll reads the window again and sends what is not
+    remembered yet.
+    """
+
+    __slots__ = ('state', 'current_date', 'pending', 'failed')
+
+    def __init__(self, state, current_date, homeworks):
+        self.state = state
+        self.current_date = current_date
+        self.pending = {work.get('homework_name'): work for work in homeworks}
+        self.failed = False
+
+    def settle(self, name, sent):
+        work = self.pending.pop(name, None)
+        if work is None:
+            return
+        cursor = self.state.cursor
+        if sent:
+            cursor.remember([work], homework.status_moment, self.current_date)
+        else:
+            self.failed = True
+        if not self.pending and not self.failed:
+            cursor.commit(self.current_date, self.state.clock.time())
+
+
+def fetch_answer(pollers, deliveries, tenant):
+    """Answer of tenant polled from its cursor, or its error report.
+
+    `pollers` maps tenants to (state, fetch) like in
+    `homework.run_scheduled`. Changes seen before are left out, the
+    answer is tracked in `deliveries` until its homeworks are sent or
+    failed, and the tenant is not polled meanwhile.
+    """
+    delivery = deliveries.get(tenant)
+    if delivery is not None and delivery.pending:
+        return []
+    state, fetch = pollers[tenant]
+    cursor = state.cursor
+    try:
+        response = (fetch or homework.get_api_answer)(cursor.from_date())
+        homework.check_response(response)
+    except Exception as error:
+        return [failure(tenant, error)]
+    current_date = response['current_date']
+    homeworks = cursor.fresh(response['homeworks'])
+    if homeworks:
+        deliveries[tenant] = Delivery(state, current_date, homeworks)
+    else:
+        cursor.commit(current_date, state.clock.time())
+    return [(tenant, dict(response, homeworks=homeworks))]
+
+
+def validate_answer(item):
+    """Homeworks of a valid answer or error report of a tenant."""
+    if isinstance(item, Message):
+        return [item]
+    tenant, response = item
+    try:
+        homework.check_response(response)
+    except Exception as error:
+        return [failure(tenant, error)]
+    return [(tenant, work) for work in response['homeworks']]
+
+
+def render_message(item):
+    if isinstance(item, Message):
+        return [item]
+    tenant, work = item
+    return [Message(
+        tenant, work.get('homework_name'), homework.parse_status(work), 1
+    )]
+
+
+def merge_answers(old, new):
+    """Homeworks of the newer answer, then earlier ones not in it."""
+    if isinstance(new, Message):
+        return collapse_errors(old, new)
+    tenant, response = new
+    try:
+        names = {work['homework_name'] for work in response['homeworks']}
+        earlier = [
+            work for work in old[1]['homeworks']
+            if work['homework_name'] not in names
+        ]
+        homeworks = response['homeworks'] + earlier
+        return tenant, dict(response, homeworks=homeworks)
+    except (KeyError, TypeError):
+        return new
+
+
+def answer_key(item):
+    if isinstance(item, Message):
+        return item.tenant, item.key
+    return item[0]
+
+
+def homework_key(item):
+    if isinstance(item, Message):
+        return item.tenant, item.key
+    tenant, work = item
+    return tenant, work.get('homework_name')
+
+
+def notification_pipeline(send, maxsize=1000, pollers=None):
+    """Fetch, validate, render and send stages of tenant notifications.
+
+    With `pollers` the pipeline starts with a fetch stage taking tenant
+    keys, otherwise with validation of (tenant, answer) items. Queued
+    polls of a tenant merge into one, queued answers of a tenant merge
+    into one, newer statuses of a homework supersede older ones, error
+    reports of a tenant collapse into one with a counter.
+    `send(tenant, text)` delivers a message, the cursor of a polled
+    tenant moves only after `send` returned for all of its statuses.
+    """
+    deliveries = {}
+
+    def settle(tenant, name, sent):
+        delivery = deliveries.get(tenant)
+        if delivery is not None:
+            delivery.settle(name, sent)
+
+    def render(item):
+        try:
+            return render_message(item)
+        except Exception:
+            tenant, work = item
+            settle(tenant, work.get('homework_name'), False)
+            raise
+
+    def deliver(message):
+        text = message.text
+        if message.count > 1:
+            text = f'{text} (x{message.count})'
+        try:
+            send(message.tenant, text)
+        except Exception:
+            settle(message.tenant, message.key, False)
+            raise
+        settle(message.tenant, message.key, True)
+
+    stages = [
+        ('validate', validate_answer, SheddingQueue(
+            maxsize, key=answer_key, merge=merge_answers
+        )),
+        ('render', render, SheddingQueue(
+            maxsize, key=homework_key, merge=collapse_errors
+        )),
+        ('send', deliver, SheddingQueue(
+            maxsize, key=homework_key, merge=collapse_errors
+        )),
+    ]
+    if pollers is not None:
+        stages.insert(0, ('fetch', partial(fetch_answer, pollers, deliveries),
+                          SheddingQueue(maxsize, key=lambda tenant: tenant)))
+    return Pipeline(stages)
@@ -0,0 +1,78 @@
+"""Practicum polls: threaded `requests` vs asyncio client.
+
+Run: python -m benchmarks.bench_async_practicum [polls] [threads] [delay_ms]
+
+HTTP/2 needs a TLS server speaking h2; the stand-in speaks HTTP/1.1, so
+only the HTTP/1.1 path of the async client is measured here.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from benchmarks.standins import PracticumStandIn
+
+
+def threaded(polls, threads):
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(homework.get_api_answer, [0] * polls))
+        return threading.active_count()
+
+
+def asynchronous(stand_in, polls, connections):
+    from async_practicum import AsyncPracticum
+
+    async def poll():
+        async with AsyncPracticum(
+            stand_in.endpoint, stand_in.headers,
+            max_connections=connections,
+        ) as client:
+            answers = await client.poll_many(dict.fromkeys(range(polls), 0))
+        failed = [
+            answer for answer in answers.values()
+            if isinstance(answer, Exception)
+        ]
+        if failed:
+            raise failed[0]
+        return threading.active_count()
+    return asyncio.run(poll())
+
+
+def run(polls=1000, threads=50, delay=0.1):
+    """Polls per second and threads in use of every client."""
+    results = {}
+    with PracticumStandIn(delay=delay) as stand_in:
+        homework.ENDPOINT = stand_in.endpoint
+        homework.HEADERS = stand_in.headers
+        cases = {
+            f'requests, {threads} threads': lambda: threaded(polls, threads),
+            f'async, {threads} connections': (
+                lambda: asynchronous(stand_in, polls, threads)
+            ),
+        }
+        for name, case in cases.items():
+            started = time.perf_counter()
+            active = case()
+            results[name] = (polls / (time.perf_counter() - started), active)
+    return results
+
+
+def main(argv):
+    logging.disable(logging.INFO)
+    polls, threads, delay_ms = (list(map(int, argv)) + [1000, 50, 100][
+        len(argv):
+    ])[:3]
+    try:
+        results = run(polls, threads, delay_ms / 1000)
+    except ImportError as err:
+        print(err)
+        return
+    for name, (rate, active) in results.items():
+        print(f'{name:>25}: {rate:8.1f} polls/s, {active} threads')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,166 @@
+"""Polling loop under faults of the Practicum and Telegram stand-ins.
+
+Run: python -m benchmarks.bench_chaos [scenario ...]
+
+Every Practicum answer brings a new homework status, so a healthy cycle
+of `homework.process_cycle` delivers one status message. Pauses between
+cycles pass on a virtual clock; recovery is the loop time from the end
+of the last faulted cycle to the end of the first healthy one.
+"""
+import logging
+import sys
+import time
+from collections import namedtuple
+from unittest import mock
+
+import telegram
+
+import homework
+from benchmarks.standins import (
+    FaultPlan, PracticumStandIn, TelegramStandIn, fail, malformed, partial,
+    slow_loris, spike,
+)
+from clock import VirtualClock
+
+CYCLES = 12
+HEALTHY_REQUESTS = 2
+CHAT_ID = 1
+
+SCENARIOS = {
+    'baseline': {},
+    'latency spikes': {'practicum': (spike(0.2), 5)},
+    'partial bodies': {'practicum': (partial(), 3)},
+    'malformed json': {'practicum': (malformed(), 3)},
+    'slow loris': {'practicum': (slow_loris(0.5), 3)},
+    '401 storm': {'practicum': (fail(401), 5)},
+    '429 storm': {'practicum': (fail(429, retry_after=1800), 3)},
+    '5xx storm': {'practicum': (fail(503), 5)},
+    'flood wait': {'telegram': (fail(429, retry_after=900), 3)},
+    'telegram 5xx': {'telegram': (fail(502), 3)},
+    'telegram 401': {'telegram': (fail(401), 3)},
+}
+
+Outcome = namedtuple('Outcome', (
+    'cycles', 'delivered', 'lost', 'throughput', 'recovery',
+    'recovery_cycles', 'exited',
+))
+
+
+def plan(faults):
+    """Healthy requests first, then the faulted ones."""
+    if faults is None:
+        return FaultPlan()
+    fault, requests = faults
+    return FaultPlan((None, HEALTHY_REQUESTS), (fault, requests))
+
+
+def recovery_of(cycles):
+    """Loop time and cycles from the last faulted to a healthy cycle.
+
+    `cycles` are `(end, faulted, healthy)`; None if the loop has not
+    recovered, zero if nothing was faulted.
+    """
+    faulted = [index for index, cycle in enumerate(cycles) if cycle[1]]
+    if not faulted:
+        return 0.0, 0
+    last = faulted[-1]
+    for index in range(last, len(cycles)):
+        if cycles[index][2]:
+            return cycles[index][0] - cycles[last][0], index - last
+    return None, None
+
+
+def run_scenario(faults, cycles=CYCLES):
+    """Outcome of `cycles` polling cycles under the faults of a scenario.
+
+    `faults` maps `practicum` and `telegram` to `(fault, requests)`.
+    """
+    practicum_faults = plan(faults.get('practicum'))
+    telegram_faults = plan(faults.get('telegram'))
+    with PracticumStandIn(faults=practicum_faults) as practicum, \
+            TelegramStandIn(faults=telegram_faults) as bot_api, \
+            mock.patch.multiple(
+                homework, ENDPOINT=practicum.endpoint,
+                HEADERS=practicum.headers, TELEGRAM_CHAT_ID=CHAT_ID
+            ):
+        practicum.changing = True
+        bot = telegram.Bot(token=bot_api.token, base_url=bot_api.base_url)
+        clock = VirtualClock()
+        state = homework.PollState(0, clock=clock)
+        fetched = []
+
+        def fetch(timestamp):
+            answer = homework.get_api_answer(timestamp)
+            fetched.append(answer)
+            return answer
+
+        def delivered():
+            return sum(
+                practicum.homework_name in text for text in bot_api.sent
+            )
+
+        done = []
+        exited = False
+        started = time.perf_counter()
+        while len(done) < cycles:
+            injected = practicum_faults.injected + telegram_faults.injected
+            before = delivered()
+            cycle_started = time.perf_counter()
+            try:
+                delay = homework.process_cycle(bot, state, fetch)
+            except SystemExit:
+                exited = True
+                break
+            clock.sleep(time.perf_counter() - cycle_started)
+            done.append((
+                clock.time(),
+                practicum_faults.injected + telegram_faults.injected
+                > injected,
+                delivered() > before,
+            ))
+            clock.sleep(delay)
+        wall = time.perf_counter() - started
+    recovery, recovery_cycles = (None, None) if exited else recovery_of(done)
+    return Outcome(
+        cycles=len(done),
+        delivered=delivered(),
+        lost=len(fetched) - delivered(),
+        throughput=len(done) / wall,
+        recovery=recovery,
+        recovery_cycles=recovery_cycles,
+        exited=exited,
+    )
+
+
+def run(names=None, cycles=CYCLES):
+    """Outcome of every scenario."""
+    return {
+        name: run_scenario(SCENARIOS[name], cycles)
+        for name in names or SCENARIOS
+    }
+
+
+def describe(outcome):
+    if outcome.exited:
+        recovery = f'exited in cycle {outcome.cycles + 1}'
+    elif outcome.recovery is None:
+        recovery = 'not recovered'
+    else:
+        recovery = (
+            f'recovered in {outcome.recovery:.0f} s, '
+            f'{outcome.recovery_cycles} cycles'
+        )
+    return (
+        f'{outcome.throughput:7.1f} cycles/s, delivered '
+        f'{outcome.delivered:2}, lost {outcome.lost}, {recovery}'
+    )
+
+
+def main(argv):
+    logging.disable(logging.CRITICAL)
+    for name, outcome in run(argv).items():
+        print(f'{name:>15}: {describe(outcome)}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,25 @@
+"""Wall time of simulated polling and drift of an accelerated clock.
+
+Run: python -m benchmarks.bench_clock [tenants]
+"""
+import sys
+
+from simulation import compare_clocks, simulate
+
+FACTORS = (3000, 30000)
+
+
+def main(argv):
+    tenants = int(argv[0]) if argv else 200
+    report = simulate(tenants=tenants, days=1)
+    print(f'{report.tenants} tenants, one virtual day: {report.cycles} '
+          f'cycles, {report.sent} sent in {report.wall_seconds:.2f} s')
+    for factor in FACTORS:
+        comparison = compare_clocks(cycles=10, factor=factor)
+        print(f'accelerated x{factor}: same messages '
+              f'{comparison.same_messages}, drift '
+              f'{comparison.max_drift:.0f} simulated s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
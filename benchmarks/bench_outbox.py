@@ -0,0 +1,50 @@
+"""Durable outbox puts per second with group commit.
+
+Run: python -m benchmarks.bench_outbox [puts] [threads ...]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from outbox import Outbox
+
+
+def measure(puts, threads):
+    with tempfile.TemporaryDirectory() as directory:
+        outbox = Outbox(os.path.join(directory, 'outbox.jsonl'))
+        per_thread = puts // threads
+
+        def producer(number):
+            for index in range(per_thread):
+                outbox.put(f'{number}-{index}', number, 'message text')
+
+        workers = [
+            threading.Thread(target=producer, args=(number,))
+            for number in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        outbox.close()
+    return per_thread * threads / elapsed
+
+
+def run(puts=2000, threads=(1, 8, 32)):
+    """Durable puts per second for every number of producer threads."""
+    return {count: measure(puts, count) for count in threads}
+
+
+def main(argv):
+    puts = int(argv[0]) if argv else 2000
+    threads = [int(arg) for arg in argv[1:]] or (1, 8, 32)
+    for count, rate in run(puts, threads).items():
+        print(f'{count:>3} threads: {rate:10.1f} puts/s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
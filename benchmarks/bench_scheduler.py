@@ -0,0 +1,84 @@
+"""Overhead of the wake-up scheduler against scanning every tenant.
+
+Run: python -m benchmarks.bench_scheduler [tenants]
+"""
+import random
+import sys
+import time
+from collections import Counter
+
+from clock import VirtualClock
+from scheduler import Scheduler
+
+PERIOD = 600
+PERIODS = 3
+
+
+def wake_cost(tenants, jitter):
+    """Microseconds per wake-up and the biggest wake-ups in one second."""
+    clock = VirtualClock()
+    scheduler = Scheduler(clock, jitter, random.Random(0))
+    scheduler.spread(range(tenants), PERIOD)
+    per_second = Counter()
+    wakes = 0
+    started = time.perf_counter()
+    while wakes < tenants * PERIODS:
+        for key in scheduler.wait():
+            per_second[int(clock.time())] += 1
+            scheduler.schedule(key, PERIOD)
+            wakes += 1
+    elapsed = time.perf_counter() - started
+    return elapsed / wakes * 1e6, max(per_second.values())
+
+
+def reschedule_cost(tenants):
+    """Microseconds per reschedule and per cancel of a scheduled key."""
+    scheduler = Scheduler(VirtualClock(), 0.1, random.Random(0))
+    scheduler.spread(range(tenants), PERIOD)
+    keys = random.Random(1).sample(range(tenants), tenants // 10)
+    started = time.perf_counter()
+    for key in keys:
+        scheduler.schedule(key, PERIOD)
+    rescheduled = time.perf_counter() - started
+    started = time.perf_counter()
+    for key in keys:
+        scheduler.cancel(key)
+    cancelled = time.perf_counter() - started
+    return rescheduled / len(keys) * 1e6, cancelled / len(keys) * 1e6
+
+
+def scan_cost(tenants, ticks=20):
+    """Microseconds per wake-up when every tick scans all tenants."""
+    due = [PERIOD * number / tenants for number in range(tenants)]
+    started = time.perf_counter()
+    for tick in range(ticks):
+        for tenant, moment in enumerate(due):
+            if moment <= tick:
+                due[tenant] = moment + PERIOD
+    per_tick = (time.perf_counter() - started) / ticks
+    return per_tick * PERIOD / tenants * 1e6
+
+
+def herd(tenants):
+    """Wake-ups in the busiest second when all tenants start together."""
+    scheduler = Scheduler(VirtualClock(), 0)
+    for key in range(tenants):
+        scheduler.schedule(key, PERIOD)
+    return len(scheduler.pop_due(PERIOD + 1))
+
+
+def main(argv):
+    tenants = int(argv[0]) if argv else 100_000
+    print(f'{tenants} tenants, {PERIODS} periods of {PERIOD} s')
+    for jitter in (0.0, 0.1):
+        microseconds, busiest = wake_cost(tenants, jitter)
+        print(f'heap, jitter {jitter:.1f}: {microseconds:6.2f} us/wake, '
+              f'busiest second {busiest} wakes')
+    print(f'scan every second: {scan_cost(tenants):6.2f} us/wake')
+    reschedule, cancel = reschedule_cost(tenants)
+    print(f'reschedule: {reschedule:.2f} us, cancel: {cancel:.2f} us')
+    print(f'no spread, busiest second: {herd(tenants)} wakes')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
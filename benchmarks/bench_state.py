@@ -0,0 +1,110 @@
+"""Memory per tenant of polling state layouts.
+
+Run: python -m benchmarks.bench_state [tenants ...]
+
+`poll_state` is `homework.PollState`, the state the polling loop keeps,
+after one notified status and one reported error per tenant. It runs
+real polling cycles, so it is measured up to `POLL_STATE_LIMIT` tenants.
+"""
+import sys
+import tracemalloc
+
+import homework
+from clock import VirtualClock
+from exceptions import RequestError
+from simulation import CountingBot, quiet_logger
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+POLL_STATE_LIMIT = 100_000
+HOMEWORK = {'id': 0, 'homework_name': 'hw', 'status': 'reviewing'}
+
+
+class SlotsRecord:
+    __slots__ = ('cursor', 'error_code', 'error_count', 'statuses')
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.error_code = 0
+        self.error_count = 0
+        self.statuses = None
+
+
+def fill_dicts(tenants):
+    """Layout of today's loop: strings, lists and exception reprs."""
+    state = {}
+    for tenant in range(tenants):
+        state[tenant] = {
+            'timestamp': 1_700_000_000 + tenant,
+            'message_storage': (
+                f'Изменился статус проверки работы "hw{tenant}". '
+                'Работа взята на проверку ревьюером.'
+            ),
+            'error_stack': [repr(ConnectionError(f'tenant {tenant}'))],
+        }
+    return state
+
+
+def fill_slots(tenants):
+    state = {}
+    for tenant in range(tenants):
+        record = SlotsRecord(1_700_000_000 + tenant)
+        record.statuses = {tenant: 2}
+        state[tenant] = record
+    return state
+
+
+def fill_poll_states(tenants):
+    clock = VirtualClock(1_700_000_000)
+    bot = CountingBot()
+
+    def failing(timestamp):
+        raise RequestError('Problem with Request')
+
+    states = {}
+    with quiet_logger():
+        for tenant in range(tenants):
+            state = homework.PollState(
+                int(clock.time()), clock=clock, tenant=tenant
+            )
+            answer = {'homeworks': [dict(HOMEWORK, id=tenant)],
+                      'current_date': int(clock.time())}
+            homework.process_cycle(bot, state, lambda timestamp: answer)
+            homework.process_cycle(bot, state, failing)
+            states[tenant] = state
+    return states
+
+
+LAYOUTS = {
+    'dicts': fill_dicts, 'slots': fill_slots, 'poll_state': fill_poll_states,
+}
+
+
+def bytes_per_tenant(fill, tenants):
+    tracemalloc.start()
+    try:
+        state = fill(tenants)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del state
+    return size / tenants
+
+
+def run(sizes=DEFAULT_SIZES):
+    """Bytes per tenant for every layout and size."""
+    return {
+        (name, tenants): bytes_per_tenant(fill, tenants)
+        for tenants in sizes
+        for name, fill in LAYOUTS.items()
+        if name != 'poll_state' or tenants <= POLL_STATE_LIMIT
+    }
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or DEFAULT_SIZES
+    for (name, tenants), size in run(sizes).items():
+        print(f'{name:>10} {tenants:>9} tenants: {size:8.1f} bytes/tenant')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+"""Read and publish cost of the shared status cache.
+
+Run: python -m benchmarks.bench_status_cache [tenants]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from status_cache import StatusCache
+
+
+def per_call(func, keys):
+    started = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+def run(tenants=10_000):
+    """Microseconds per call of cache operations and a JSON snapshot read."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'status.bin')
+        writer = StatusCache(path, capacity=tenants * 2)
+        results['publish'] = per_call(
+            lambda key: writer.publish(key, 0.0, f'hw{key}', 'reviewing'),
+            range(tenants)
+        )
+        reader = StatusCache(path)
+        results['first read'] = per_call(reader.read, range(tenants))
+        results['read'] = per_call(reader.read, range(tenants))
+        snapshot = os.path.join(directory, 'status.json')
+        with open(snapshot, 'w') as file:
+            json.dump(
+                {str(key): ['hw', 'reviewing'] for key in range(tenants)},
+                file
+            )
+
+        def read_snapshot(key):
+            with open(snapshot) as file:
+                return json.load(file)[str(key)]
+
+        results['json snapshot read'] = per_call(
+            read_snapshot, range(0, tenants, max(1, tenants // 100))
+        )
+        writer.close()
+        reader.close()
+    return results
+
+
+def main(argv):
+    tenants = int(argv[0]) if argv else 10_000
+    print(f'{tenants} tenants')
+    for name, microseconds in run(tenants).items():
+        print(f'{name:>18}: {microseconds:10.2f} us')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
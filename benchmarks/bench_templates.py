@@ -0,0 +1,84 @@
+"""Status message rendering: compiled templates vs the former f-string.
+
+Run: python -m benchmarks.bench_templates [messages]
+
+Both `parse_status` versions are timed with the tracing wrapper the
+polling loop calls them through.
+"""
+import sys
+import timeit
+
+import homework
+import tracing
+from templates import Renderer, merge_locales
+
+HOMEWORK_VERDICTS = homework.HOMEWORK_VERDICTS
+DISTINCT_NAMES = 1000
+
+
+@tracing.traced('parse_status')
+def f_string_parse_status(homework):
+    """`parse_status` as it was before templates."""
+    important_keys = ('status', 'homework_name')
+    homework_name = homework.get('homework_name')
+    status = homework.get('status')
+    verdict = HOMEWORK_VERDICTS.get(status)
+
+    for key in important_keys:
+        if not (key in homework):
+            raise KeyError(f'Not keyname "{key}" in homework')
+    if not (status in HOMEWORK_VERDICTS):
+        raise NameError('Not correct status in homework')
+
+    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+
+
+def payload(messages, distinct):
+    statuses = list(HOMEWORK_VERDICTS)
+    return [
+        {'homework_name': f'student{number % distinct}__hw.zip',
+         'status': statuses[number % len(statuses)],
+         'lesson_name': 'Bots'}
+        for number in range(messages)
+    ]
+
+
+def run(messages=200_000):
+    """Nanoseconds per message, best of 5 runs."""
+    parse_status = homework.parse_status
+    localized_status = homework.localized_status
+    custom = Renderer(
+        merge_locales(homework.LOCALES, {'en': {
+            'message': '{homework_name} ({lesson_name}): {verdict}',
+        }}),
+        homework.DEFAULT_LOCALE,
+    )
+    cases = {
+        'f-string': f_string_parse_status,
+        'templates ru': parse_status,
+        'templates en': lambda item: localized_status(item, 'en'),
+        'custom fields': lambda item: custom.render(
+            item['homework_name'], item['status'], 'en', item
+        ),
+    }
+    results = {}
+    for names, distinct in (('repeated', DISTINCT_NAMES),
+                            ('unique', messages)):
+        items = payload(messages, distinct)
+        for name, render in cases.items():
+            best = min(timeit.repeat(
+                lambda: [render(item) for item in items],
+                number=1, repeat=5
+            ))
+            results[f'{name}, {names} names'] = best / messages * 1e9
+    return results
+
+
+def main(argv):
+    messages = int(argv[0]) if argv else 200_000
+    for name, nanoseconds in run(messages).items():
+        print(f'{name:>30}: {nanoseconds:6.0f} ns/message')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""Overhead of tracing instrumentation per call.
+
+Run: python -m benchmarks.bench_tracing [calls]
+"""
+import os
+import sys
+import tempfile
+import timeit
+
+import tracing
+
+
+def plain(value):
+    return value
+
+
+traced = tracing.traced('plain')(plain)
+
+
+def cycle():
+    with tracing.trace('cycle'):
+        traced(1)
+
+
+def run(calls=100_000):
+    """Nanoseconds per call for plain, traced unsampled and sampled."""
+    previous = tracing.TRACER
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'traces.jsonl')
+        try:
+            results['plain'] = timeit.timeit(lambda: plain(1), number=calls)
+            for name, rate in (('sampling off', 0.0), ('sampling on', 1.0)):
+                tracing.configure(path, rate)
+                results[name] = timeit.timeit(cycle, number=calls)
+        finally:
+            tracing.TRACER = previous
+    return {name: total / calls * 1e9 for name, total in results.items()}
+
+
+def main(argv):
+    calls = int(argv[0]) if argv else 100_000
+    for name, nanoseconds in run(calls).items():
+        print(f'{name:>12}: {nanoseconds:8.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
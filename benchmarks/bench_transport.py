@@ -0,0 +1,61 @@
+"""Telegram send throughput: default bot vs pooled parallel transport.
+
+Run: python -m benchmarks.bench_transport [messages] [chats] [delay_ms]
+"""
+import sys
+import time
+
+import telegram
+
+from benchmarks.standins import TelegramStandIn
+from transport import ChatDispatcher, pooled_bot
+
+
+def serial(bot, messages, chats):
+    for number in range(messages):
+        bot.send_message(number % chats + 1, f'message {number}')
+
+
+def parallel(bot, messages, chats, workers):
+    dispatcher = ChatDispatcher(bot, workers=workers)
+    futures = [
+        dispatcher.submit(number % chats + 1, f'message {number}')
+        for number in range(messages)
+    ]
+    for future in futures:
+        future.result()
+    dispatcher.close()
+
+
+def run(messages=500, chats=50, delay=0.005, workers=8):
+    """Messages per second of every transport."""
+    results = {}
+    with TelegramStandIn(delay=delay) as stand_in:
+        default = telegram.Bot(
+            token=stand_in.token, base_url=stand_in.base_url
+        )
+        pooled = pooled_bot(stand_in.token, workers, stand_in.base_url)
+        cases = {
+            'default serial': lambda: serial(default, messages, chats),
+            'pooled serial': lambda: serial(pooled, messages, chats),
+            f'pooled {workers} workers': (
+                lambda: parallel(pooled, messages, chats, workers)
+            ),
+        }
+        for name, case in cases.items():
+            started = time.perf_counter()
+            case()
+            results[name] = messages / (time.perf_counter() - started)
+    return results
+
+
+def main(argv):
+    messages, chats, delay_ms = (list(map(int, argv)) + [500, 50, 5][
+        len(argv):
+    ])[:3]
+    for name, rate in run(messages, chats, delay_ms / 1000).items():
+        print(f'{name:>20}: {rate:8.1f} messages/s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,70 @@
+"""Validation of big `homeworks` lists: batch vs parse_status per item.
+
+Run: python -m benchmarks.bench_validation [size ...]
+"""
+import random
+import sys
+import time
+
+import homework
+
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+BROKEN_SHARE = 0.01
+
+
+def payload(size, seed=0):
+    rng = random.Random(seed)
+    statuses = list(homework.HOMEWORK_VERDICTS)
+    items = []
+    for number in range(size):
+        item = {
+            'id': number,
+            'homework_name': f'student__hw{number}.zip',
+            'status': rng.choice(statuses),
+            'date_updated': '2026-01-01T00:00:00Z',
+        }
+        if rng.random() < BROKEN_SHARE:
+            item['status'] = 'unknown'
+        items.append(item)
+    return items
+
+
+def per_item(homeworks):
+    messages = []
+    errors = []
+    for index, item in enumerate(homeworks):
+        try:
+            messages.append(homework.parse_status(item))
+        except Exception as error:
+            errors.append((index, error))
+    return messages, errors
+
+
+def best_of(func, argument, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes=DEFAULT_SIZES):
+    """Microseconds per item of both paths for every payload size."""
+    results = {}
+    for size in sizes:
+        homeworks = payload(size)
+        for name, func in (('parse_status', per_item),
+                           ('batch', homework.validate_homeworks)):
+            results[(name, size)] = best_of(func, homeworks) / size * 1e6
+    return results
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or DEFAULT_SIZES
+    for (name, size), micro in run(sizes).items():
+        print(f'{name:>12} {size:>7} items: {micro:6.3f} us/item')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,298 @@
+"""Local stand-ins of external HTTP APIs for benchmarks and tests.
+
+A stand-in with a `FaultPlan` in `faults` breaks the requests the plan
+says, in order: see `spike`, `fail`, `malformed`, `partial` and
+`slow_loris`.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class StandIn:
+    """HTTP server on a free local port running in a background thread."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, delay=0.0, faults=None):
+        self.delay = delay
+        self.faults = faults
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = StandInServer(('127.0.0.1', 0), self.handler_class)
+        self.server.stand_in = self
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def inject(self, handler):
+        """Apply the fault planned for the request, True if it answered."""
+        fault = self.faults and self.faults.next()
+        return bool(fault and fault(handler))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FaultPlan:
+    """Faults of successive requests, as phases of `(fault, requests)`.
+
+    A phase with fault None passes its requests through, so does every
+    request after the last phase. `injected` counts faulted requests.
+    """
+
+    def __init__(self, *phases):
+        self._faults = deque(
+            fault for fault, requests in phases for _ in range(requests)
+        )
+        self._lock = threading.Lock()
+        self.injected = 0
+
+    def next(self):
+        with self._lock:
+            if not self._faults:
+                return None
+            fault = self._faults.popleft()
+            if fault is not None:
+                self.injected += 1
+            return fault
+
+
+def spike(seconds):
+    """Answer normally, `seconds` late."""
+    def fault(handler):
+        time.sleep(seconds)
+        return False
+    return fault
+
+
+def fail(status, retry_after=None):
+    """Error answer of the API with HTTP `status`."""
+    def fault(handler):
+        handler.fail(status, retry_after)
+        return True
+    return fault
+
+
+def malformed():
+    """Successful answer with a body that is not JSON."""
+    def fault(handler):
+        handler.send_body(200, b'{"ok": true, "result": {"homeworks": [')
+        return True
+    return fault
+
+
+def partial():
+    """Normal answer cut in the middle, then the connection is closed."""
+    def fault(handler):
+        body = json.dumps(handler.success()[1]).encode()
+        handler.send_body(200, body[:len(body) // 2], length=len(body))
+        handler.close_connection = True
+        return True
+    return fault
+
+
+def slow_loris(seconds, chunks=10):
+    """Normal answer trickled in `chunks` over `seconds`."""
+    def fault(handler):
+        status, payload = handler.success()
+        handler.send_body(
+            status, json.dumps(payload).encode(), pause=seconds / chunks,
+            chunks=chunks
+        )
+        return True
+    return fault
+
+
+class TelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_params(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Type', '').startswith(
+            'application/json'
+        ):
+            return json.loads(body or b'{}')
+        return dict(parse_qsl(body.decode()))
+
+    def reply(self, status, payload, headers=None):
+        self.send_body(status, json.dumps(payload).encode(), headers)
+
+    def send_body(self, status, body, headers=None, length=None, pause=0,
+                  chunks=1):
+        """Body of `length` bytes as announced, written in `chunks`."""
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header(
+            'Content-Length', str(len(body) if length is None else length)
+        )
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        size = -(-len(body) // chunks)
+        for start in range(0, len(body), size):
+            if pause:
+                self.wfile.flush()
+                time.sleep(pause)
+            self.wfile.write(body[start:start + size])
+
+    def fail(self, status, retry_after=None):
+        payload = {'ok': False, 'error_code': status,
+                   'description': HTTPStatus(status).phrase}
+        if retry_after is not None:
+            payload['description'] = (
+                f'Too Many Requests: retry after {retry_after}'
+            )
+            payload['parameters'] = {'retry_after': retry_after}
+        self.reply(status, payload)
+
+    def success(self):
+        stand_in = self.server.stand_in
+        if not self.path.startswith(f'/bot{stand_in.token}/'):
+            return 401, {'ok': False, 'error_code': 401,
+                         'description': 'Unauthorized'}
+        method = self.path.rsplit('/', 1)[-1]
+        return 200, {'ok': True, 'result': stand_in.result(
+            method, self.params, self.number
+        )}
+
+    def do_POST(self):
+        stand_in = self.server.stand_in
+        self.params = self.read_params()
+        self.number = stand_in.count()
+        if stand_in.inject(self):
+            return
+        if stand_in.delay:
+            time.sleep(stand_in.delay)
+        self.reply(*self.success())
+
+    do_GET = do_POST
+
+
+class TelegramStandIn(StandIn):
+    """Bot API answering `getMe`, `getChat`, pins and message methods."""
+
+    handler_class = TelegramHandler
+    token = '123456:stand-in'
+
+    def __init__(self, delay=0.0, faults=None):
+        super().__init__(delay, faults)
+        self.sent = []
+
+    @property
+    def base_url(self):
+        return f'{self.url}/bot'
+
+    def result(self, method, params, number):
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'Stand-in',
+                    'username': 'stand_in_bot'}
+        chat_id = int(params.get('chat_id', 0))
+        if method in ('pinChatMessage', 'unpinChatMessage'):
+            return True
+        if method == 'getChat':
+            return {'id': chat_id, 'type': 'private'}
+        if method == 'sendMessage':
+            self.sent.append(params.get('text', ''))
+        return {
+            'message_id': int(params.get('message_id', number)),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': params.get('text', ''),
+        }
+
+
+class PracticumHandler(TelegramHandler):
+    def fail(self, status, retry_after=None):
+        headers = {}
+        if retry_after is not None:
+            headers['Retry-After'] = str(retry_after)
+        self.reply(
+            status, {'code': HTTPStatus(status).name.lower()}, headers
+        )
+
+    def success(self):
+        stand_in = self.server.stand_in
+        if self.headers.get('Authorization') != f'OAuth {stand_in.token}':
+            return 401, {'code': 'not_authenticated'}
+        query = dict(parse_qsl(self.path.partition('?')[2]))
+        return 200, stand_in.answer(
+            int(query.get('from_date', 0)), self.number
+        )
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        self.number = stand_in.count()
+        if stand_in.inject(self):
+            return
+        if stand_in.delay:
+            time.sleep(stand_in.delay)
+        self.reply(*self.success())
+
+
+class PracticumStandIn(StandIn):
+    """Homework statuses API answering with statuses since `from_date`."""
+
+    handler_class = PracticumHandler
+    token = 'stand-in-oauth-token'
+    homework_name = 'stand_in__hw.zip'
+    statuses = ('reviewing', 'rejected', 'approved')
+    changing = False
+
+    @property
+    def endpoint(self):
+        return f'{self.url}/api/user_api/homework_statuses/'
+
+    @property
+    def headers(self):
+        return {'Authorization': f'OAuth {self.token}'}
+
+    def answer(self, from_date, number=1):
+        """One reviewing homework since 0, nothing newer.
+
+        With `changing` every answer brings a new homework, its name
+        prefixed with the request number, in a rotating status.
+        """
+        homeworks = []
+        if self.changing:
+            homeworks.append({
+                'homework_name': f'{number}_{self.homework_name}',
+                'status': self.statuses[number % len(self.statuses)],
+                'date_updated': '2026-01-01T00:00:00Z',
+            })
+        elif from_date == 0:
+            homeworks.append({
+                'homework_name': self.homework_name,
+                'status': 'reviewing',
+                'date_updated': '2026-01-01T00:00:00Z',
+            })
+        return {'homeworks': homeworks, 'current_date': int(time.time())}
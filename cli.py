@@ -0,0 +1,336 @@
+"""Command line of the bot.
+
+Run: python cli.py {run,once,bench,replay,soak,inspect} [options]
+
+Subcommands import their modules lazily, so `inspect` and `replay` do
+not pay for Telegram and HTTP client imports.
+"""
+import argparse
+import json
+import os
+import sys
+
+BENCHMARKS = (
+    'state', 'transport', 'outbox', 'tracing', 'validation', 'scheduler',
+    'status_cache', 'templates', 'async_practicum', 'chaos', 'clock',
+)
+
+
+def make_bot(homework, concurrency):
+    """Bot with a connection pool of `concurrency` size if it is given."""
+    if concurrency:
+        from transport import pooled_bot
+        return pooled_bot(homework.TELEGRAM_TOKEN, concurrency)
+    import telegram
+    return telegram.Bot(token=homework.TELEGRAM_TOKEN)
+
+
+def check_readiness(homework, bot):
+    """Preflight before the first cycle, exit if a token is rejected."""
+    import preflight
+
+    readiness = preflight.run(*homework.startup_checks(bot))
+    for check in readiness.checks:
+        status = 'ok' if check.ok else 'FAILED'
+        print(f'preflight {check.name}: {status} '
+              f'{check.latency * 1000:.0f} ms {check.detail}',
+              file=sys.stderr)
+    if readiness.fatal:
+        sys.exit('Preflight failed: '
+                 + ', '.join(check.name for check in readiness.fatal))
+    return readiness
+
+
+def serve(interval=None, concurrency=None, cycles=None, preflight=True):
+    """Polling loop of one process, endless unless `cycles` is given."""
+    import time
+
+    import homework
+
+    if interval:
+        homework.RETRY_PERIOD = interval
+    homework.check_tokens()
+    bot = make_bot(homework, concurrency)
+    if preflight:
+        check_readiness(homework, bot)
+    bot, state, fetch = homework.prepare(bot)
+    done = 0
+    delay = None
+    while cycles is None or done < cycles:
+        delay = homework.process_cycle(bot, state, fetch)
+        done += 1
+        if cycles is None or done < cycles:
+            time.sleep(delay)
+    return delay
+
+
+def command_run(args):
+    if args.workers == 1:
+        serve(args.interval, args.concurrency, preflight=args.preflight)
+        return 0
+    if not os.getenv('LEASE_DB'):
+        from dotenv import load_dotenv
+        load_dotenv()
+    if not os.getenv('LEASE_DB'):
+        sys.exit('Several workers need LEASE_DB to share the chats')
+    import multiprocessing
+
+    processes = [
+        multiprocessing.Process(
+            target=serve,
+            args=(args.interval, args.concurrency, None, args.preflight),
+            name=f'worker-{number}'
+        )
+        for number in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return max(process.exitcode or 0 for process in processes)
+
+
+def command_once(args):
+    delay = serve(args.interval, args.concurrency, 1, args.preflight)
+    print(json.dumps({'next_poll_in': delay}))
+    return 0
+
+
+def command_bench(args):
+    import importlib
+
+    for name in args.names or BENCHMARKS:
+        print(f'== {name}')
+        importlib.import_module(f'benchmarks.bench_{name}').main([])
+    return 0
+
+
+def command_replay(args):
+    from replay import replay
+
+    report = replay(args.path, args.speed, args.digest_window)
+    print(json.dumps({
+        'cycles': report.cycles,
+        'sent': len(report.sent),
+        'expected': len(report.expected),
+        'mismatches': report.mismatches,
+        'virtual_seconds': report.virtual_seconds,
+        'wall_seconds': round(report.wall_seconds, 3),
+    }, ensure_ascii=False, indent=2))
+    return 1 if report.mismatches else 0
+
+
+def command_soak(args):
+    import soak
+
+    if args.record and not args.baseline:
+        print('--record needs --baseline', file=sys.stderr)
+        return 2
+    report = soak.soak(args.cycles, args.tenants)
+    result = report._asdict()
+    failed = []
+    if args.record:
+        soak.save_baseline(report, args.baseline)
+    elif args.baseline:
+        failed = soak.regressions(report, soak.load_baseline(args.baseline))
+        result['regressions'] = [
+            {'metric': name, 'value': value, 'limit': limit}
+            for name, value, limit in failed
+        ]
+    print(json.dumps(result, indent=2))
+    return 1 if failed else 0
+
+
+def outbox_summary(path):
+    from outbox import read_log
+
+    pending = {}
+    acked = 0
+    for record in read_log(path):
+        if record['op'] == 'put':
+            pending[record['key']] = record
+        elif pending.pop(record['key'], None) is not None:
+            acked += 1
+    return {
+        'pending': [
+            {'key': key, 'chat_id': record['chat_id'], 'text': record['text']}
+            for key, record in pending.items()
+        ],
+        'acked': acked,
+    }
+
+
+def leases_summary(path):
+    from leases import LeaseStore
+
+    store = LeaseStore(path, owner='inspect')
+    try:
+        return {
+            'leases': [
+                {'tenant': tenant, 'owner': owner, 'expires': expires}
+                for tenant, owner, expires in store.leases()
+            ],
+            'sent_keys': store.sent_count(),
+        }
+    finally:
+        store.close()
+
+
+def recording_summary(path):
+    from collections import Counter
+
+    from replay import load_recording
+
+    records = load_recording(path)
+    return {
+        'records': dict(Counter(record['k'] for record in records)),
+        'errors': dict(Counter(
+            record['e'] for record in records if record['k'] == 'err'
+        )),
+        'first': records[0]['t'] if records else None,
+        'last': records[-1]['t'] if records else None,
+    }
+
+
+def trace_summary(path):
+    from tracing import STATUS_OK
+
+    spans = {}
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            for resource in json.loads(line)['resourceSpans']:
+                for scope in resource['scopeSpans']:
+                    for span in scope['spans']:
+                        stats = spans.setdefault(
+                            span['name'], {'count': 0, 'errors': 0, 'ms': []}
+                        )
+                        stats['count'] += 1
+                        stats['errors'] += span['status']['code'] != STATUS_OK
+                        stats['ms'].append((
+                            int(span['endTimeUnixNano'])
+                            - int(span['startTimeUnixNano'])
+                        ) / 1e6)
+    for stats in spans.values():
+        durations = stats.pop('ms')
+        stats['mean_ms'] = round(sum(durations) / len(durations), 3)
+        stats['max_ms'] = round(max(durations), 3)
+    return spans
+
+
+def latency_summary(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def status_summary(path):
+    from status_cache import StatusCache
+
+    cache = StatusCache(path)
+    try:
+        return [status._asdict() for status in cache.statuses()]
+    finally:
+        cache.close()
+
+
+INSPECTED = (
+    ('outbox', 'OUTBOX_PATH', outbox_summary),
+    ('leases', 'LEASE_DB', leases_summary),
+    ('recording', 'RECORD_FILE', recording_summary),
+    ('trace', 'TRACE_FILE', trace_summary),
+    ('latency', 'LATENCY_FILE', latency_summary),
+    ('status', 'STATUS_CACHE', status_summary),
+)
+
+
+def command_inspect(args):
+    report = {}
+    for name, _, summary in INSPECTED:
+        path = getattr(args, name)
+        if path and os.path.exists(path):
+            report[name] = summary(path)
+        elif path:
+            report[name] = None
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+def positive(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('should be 1 or more')
+    return number
+
+
+def benchmark(value):
+    if value not in BENCHMARKS:
+        raise argparse.ArgumentTypeError(f'unknown benchmark {value!r}')
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description=__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    loop = argparse.ArgumentParser(add_help=False)
+    loop.add_argument('--interval', type=positive,
+                      help='seconds between polls, RETRY_PERIOD by default')
+    loop.add_argument('--concurrency', type=positive,
+                      help='keep-alive connections to Telegram Bot API')
+    loop.add_argument('--no-preflight', dest='preflight',
+                      action='store_false',
+                      help='skip DNS, token and chat checks')
+
+    run = commands.add_parser('run', parents=[loop],
+                              help='poll and notify until stopped')
+    run.add_argument('--workers', type=positive, default=1,
+                     help='worker processes sharing chats via LEASE_DB')
+    run.set_defaults(handler=command_run)
+
+    once = commands.add_parser('once', parents=[loop],
+                               help='one poll-to-notify cycle')
+    once.set_defaults(handler=command_once)
+
+    bench = commands.add_parser('bench', help='run benchmarks')
+    bench.add_argument('names', nargs='*', type=benchmark, metavar='name',
+                       help=', '.join(BENCHMARKS))
+    bench.set_defaults(handler=command_bench)
+
+    replay = commands.add_parser('replay', help='replay a recording')
+    replay.add_argument('path')
+    replay.add_argument('--speed', type=float)
+    replay.add_argument('--digest-window', type=int)
+    replay.set_defaults(handler=command_replay)
+
+    soak = commands.add_parser(
+        'soak', help='memory of a long simulated run against a baseline'
+    )
+    soak.add_argument('--cycles', type=positive, default=1_000_000)
+    soak.add_argument('--tenants', type=positive, default=100)
+    soak.add_argument('--baseline', help='JSON file of recorded metrics')
+    soak.add_argument('--record', action='store_true',
+                      help='write the baseline instead of checking it')
+    soak.set_defaults(handler=command_soak)
+
+    inspect = commands.add_parser(
+        'inspect', help='dump persisted state, span and latency stats'
+    )
+    for name, variable, _ in INSPECTED:
+        inspect.add_argument(f'--{name}', help=f'${variable} by default')
+    inspect.set_defaults(handler=command_inspect)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'inspect':
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        for name, variable, _ in INSPECTED:
+            if getattr(args, name) is None:
+                setattr(args, name, os.getenv(variable))
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import time
+
+
+class WallClock:
+    """Real time clock."""
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class ScaledClock(WallClock):
+    """Real time clock running `factor` times faster.
+
+    Sleeps really happen, but last `factor` times shorter. Used to check
+    that virtual time behaves like the wall clock.
+    """
+
+    def __init__(self, factor, start=None):
+        self.factor = factor
+        self._start = time.time() if start is None else start
+        self._origin = time.monotonic()
+
+    def monotonic(self):
+        return (time.monotonic() - self._origin) * self.factor
+
+    def time(self):
+        return self._start + self.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.factor)
+
+
+class VirtualClock:
+    """Clock whose time moves only when somebody sleeps."""
+
+    def __init__(self, start=0.0):
+        self._now = start
+
+    def time(self):
+        return self._now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        if seconds < 0:
+            raise ValueError('sleep length must be non-negative')
+        self._now += seconds
+
+    def advance_to(self, moment):
+        """Jump forward to the moment, never backward."""
+        self._now = max(self._now, moment)
@@ -0,0 +1,134 @@
+import json
+import os
+
+DEFAULT_OVERLAP = 60
+GAP_AFTER = 1200
+
+
+def homework_key(homework):
+    """Id of homework, its name if the answer has no ids."""
+    homework_id = homework.get('id')
+    if homework_id is None:
+        return homework.get('homework_name')
+    return homework_id
+
+
+def change_of(homework):
+    """Status and update time, a change of homework."""
+    return homework.get('status'), homework.get('date_updated')
+
+
+class Cursor:
+    """`from_date` of a tenant with an overlap window and dedup.
+
+    Once a poll is committed, the next one asks for changes since
+    `position - overlap`, so a change the API shows a bit late (clock
+    skew of its replicas) is still read. A change is its homework key,
+    status and update time; one already seen is dropped, so overlapping
+    answers send nothing twice. A change is remembered only once its
+    message is queued, a cycle failed before that notifies it again.
+    `position` moves to `current_date` of an answer only by `commit`,
+    after its messages are sent: a failed cycle reads the same window
+    again.
+    """
+
+    __slots__ = ('position', 'overlap', 'checked', 'seen')
+
+    def __init__(self, position, overlap=DEFAULT_OVERLAP, checked=None,
+                 seen=None):
+        self.position = position
+        self.overlap = overlap
+        self.checked = checked
+        self.seen = seen or {}
+
+    def from_date(self):
+        if self.checked is None:
+            return self.position
+        return max(0, int(self.position - self.overlap))
+
+    def fresh(self, homeworks):
+        """Homeworks with changes not seen yet."""
+        if not homeworks:
+            return homeworks
+        return [
+            homework for homework in homeworks if not self.is_seen(homework)
+        ]
+
+    def is_seen(self, homework):
+        if not isinstance(homework, dict):
+            return False
+        entry = self.seen.get(homework_key(homework))
+        return entry is not None and entry[:2] == change_of(homework)
+
+    def remember(self, homeworks, moment, fallback):
+        """Mark changes as seen once their messages are queued.
+
+        `moment(homework, fallback)` gives the time of a change, entries
+        older than the window are forgotten on commit.
+        """
+        for homework in homeworks or ():
+            if isinstance(homework, dict):
+                self.seen[homework_key(homework)] = (
+                    *change_of(homework), moment(homework, fallback)
+                )
+
+    def lag(self, now):
+        """Seconds since the last committed poll, zero if it is recent."""
+        if self.checked is None or now - self.checked <= GAP_AFTER:
+            return 0
+        return now - self.checked
+
+    def commit(self, current_date, now):
+        """Move past a delivered answer, return the closed gap in seconds."""
+        gap = self.lag(now)
+        self.position = max(self.position, current_date)
+        self.checked = now
+        if self.seen:
+            horizon = self.from_date()
+            for key in [
+                key for key, entry in self.seen.items() if entry[2] < horizon
+            ]:
+                del self.seen[key]
+        return gap
+
+
+class CursorStore:
+    """Cursors of tenants in a directory, a JSON file per tenant.
+
+    A restarted bot resumes from the stored position instead of the
+    start time, so changes made while it was down are not skipped. A save
+    replaces the file of one tenant atomically and durably, the others
+    are not rewritten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, tenant):
+        return os.path.join(self.path, f'{tenant}.json')
+
+    def load(self, tenant, cursor):
+        """Stored cursor of tenant, `cursor` if there is none."""
+        try:
+            with open(self._file(tenant), encoding='utf-8') as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return cursor
+        return Cursor(
+            entry['position'], cursor.overlap, entry['checked'],
+            {key: tuple(change) for key, *change in entry['seen']},
+        )
+
+    def save(self, tenant, cursor):
+        path = self._file(tenant)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({
+                'position': cursor.position,
+                'checked': cursor.checked,
+                'seen': [[key, *entry] for key, entry in cursor.seen.items()],
+            }, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
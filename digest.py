@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+from telegram.constants import MAX_MESSAGE_LENGTH
+
+DIGEST_SEPARATOR = '\n\n'
+ELLIPSIS = '…'
+
+Digest = namedtuple('Digest', ('chat_id', 'text', 'changes'))
+
+
+def split_digest(messages, limit=MAX_MESSAGE_LENGTH):
+    """Pack messages into as few texts as Telegram length limit allows."""
+    chunks = []
+    current = ''
+    for message in messages:
+        if len(message) > limit:
+            message = message[:limit - len(ELLIPSIS)] + ELLIPSIS
+        if not current:
+            current = message
+        elif len(current) + len(DIGEST_SEPARATOR) + len(message) <= limit:
+            current = DIGEST_SEPARATOR.join((current, message))
+        else:
+            chunks.append(current)
+            current = message
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class DigestBuffer:
+    """Collect status messages per chat and release them as digests.
+
+    The window opens with the first queued message of a chat. A newer
+    message for the same homework replaces the queued one, so a burst of
+    transitions costs a single line in the digest. A popped digest
+    counts as delivered, the caller resends it until it is sent.
+    `changes` of a digest are the update times of its messages, so two
+    digests of equal text about different transitions differ.
+    """
+
+    def __init__(self, window, limit=MAX_MESSAGE_LENGTH):
+        self.window = window
+        self.limit = limit
+        self._pending = {}
+        self._delivered = {}
+
+    def add(self, chat_id, homework_name, message, now, change=None):
+        """Queue message. False means it repeats the delivered one.
+
+        `change` is the update time of the status, `now` if it is absent.
+        """
+        key = (chat_id, homework_name)
+        if self._delivered.get(key) == message:
+            if chat_id in self._pending:
+                self._pending[chat_id][1].pop(homework_name, None)
+            return False
+        _, messages = self._pending.setdefault(chat_id, (now, {}))
+        messages.pop(homework_name, None)
+        messages[homework_name] = (message, now if change is None else change)
+        return True
+
+    def pop_due(self, now):
+        """Digests of chats with elapsed window, split by length limit."""
+        due = []
+        for chat_id, (opened_at, messages) in list(self._pending.items()):
+            if now - opened_at < self.window:
+                continue
+            del self._pending[chat_id]
+            for homework_name, (message, _) in messages.items():
+                self._delivered[(chat_id, homework_name)] = message
+            changes = tuple(change for _, change in messages.values())
+            due.extend(
+                Digest(chat_id, text, changes)
+                for text in split_digest(
+                    [message for message, _ in messages.values()], self.limit
+                )
+            )
+        return due
@@ -1,24 +1,79 @@
-class WorkWithWebError(Exception):
-    pass
-
-
-class NotCorrectResponseError(WorkWithWebError):
-    pass
-
-class RequestError(WorkWithWebError):
-    pass
-
-class StatusCodeError(WorkWithWebError):
-    pass
-
-
-class BotError(Exception):
-    pass
-
-
-class AuthorizationError(BotError):
-    pass
-
-
-class SendRequestError(BotError):
-    pass
+from http import HTTPStatus
+
+RETRYABLE = 'retryable'
+PERMANENT = 'permanent'
+THROTTLED = 'throttled'
+
+
+def classify_status(status_code):
+    """Retry class for HTTP status code."""
+    if status_code == HTTPStatus.TOO_MANY_REQUESTS:
+        return THROTTLED
+    if (
+        status_code is None
+        or status_code < HTTPStatus.BAD_REQUEST
+        or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or status_code == HTTPStatus.REQUEST_TIMEOUT
+    ):
+        return RETRYABLE
+    return PERMANENT
+
+
+def error_key(error):
+    """Hashable identity of error, cheaper to keep than its repr."""
+    return type(error), getattr(error, 'status_code', None)
+
+
+class ClassifiedError(Exception):
+    """Error with retry class and timing of the failed call."""
+
+    kind = RETRYABLE
+
+    def __init__(self, message='', status_code=None, retry_after=None,
+                 latency=None, kind=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.latency = latency
+        if kind is not None:
+            self.kind = kind
+
+    @property
+    def retryable(self):
+        return self.kind == RETRYABLE
+
+    @property
+    def permanent(self):
+        return self.kind == PERMANENT
+
+    @property
+    def throttled(self):
+        return self.kind == THROTTLED
+
+
+class WorkWithWebError(ClassifiedError):
+    pass
+
+
+class NotCorrectResponseError(WorkWithWebError):
+    pass
+
+
+class RequestError(WorkWithWebError):
+    pass
+
+
+class StatusCodeError(WorkWithWebError):
+    pass
+
+
+class BotError(ClassifiedError):
+    pass
+
+
+class AuthorizationError(BotError):
+    kind = PERMANENT
+
+
+class SendRequestError(BotError):
+    kind = PERMANENT
@@ -0,0 +1,123 @@
+import fnmatch
+import json
+import re
+from collections import Counter
+
+SECONDS_IN_HOUR = 60 * 60
+HOURS_IN_DAY = 24
+FILTERED_STATUS = 'status'
+FILTERED_QUIET_HOURS = 'quiet_hours'
+FILTERED_NAME = 'homework_name'
+
+
+def quiet_table(quiet_hours):
+    """24 flags, True for hours of silence. [23, 8] means 23:00-07:59."""
+    if not quiet_hours:
+        return None
+    start, end = quiet_hours
+    return tuple(
+        (start <= hour < end) if start <= end
+        else (hour >= start or hour < end)
+        for hour in range(HOURS_IN_DAY)
+    )
+
+
+def compile_patterns(patterns):
+    """One regex matching any of shell-style homework name patterns."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(item) for item in patterns))
+
+
+class SubscriptionFilter:
+    """Compiled notification rules of one tenant.
+
+    Status check is a set lookup, quiet hours a tuple lookup by hour and
+    name patterns a single precompiled regex, so filtering costs less
+    than rendering the message it saves. Statuses of quiet hours are not
+    dropped but held until the quiet hours are over.
+    """
+
+    __slots__ = ('statuses', 'quiet', 'pattern', 'utc_offset', 'counters',
+                 'held')
+
+    def __init__(self, statuses=None, quiet_hours=None,
+                 homework_patterns=None, utc_offset=0):
+        self.statuses = None if statuses is None else frozenset(statuses)
+        self.quiet = quiet_table(quiet_hours)
+        self.pattern = compile_patterns(homework_patterns)
+        self.utc_offset = utc_offset * SECONDS_IN_HOUR
+        self.counters = Counter()
+        self.held = {}
+
+    @classmethod
+    def from_dict(cls, rules):
+        return cls(
+            statuses=rules.get('statuses'),
+            quiet_hours=rules.get('quiet_hours'),
+            homework_patterns=rules.get('homework_patterns'),
+            utc_offset=rules.get('utc_offset', 0),
+        )
+
+    def is_quiet(self, now):
+        return self.quiet is not None and self.quiet[
+            int((now + self.utc_offset) // SECONDS_IN_HOUR) % HOURS_IN_DAY
+        ]
+
+    def reason(self, homework, now):
+        """Why homework is filtered out, None if it passes."""
+        if (
+            self.statuses is not None
+            and homework.get('status') not in self.statuses
+        ):
+            return FILTERED_STATUS
+        if self.pattern is not None and not self.pattern.match(
+            homework.get('homework_name') or ''
+        ):
+            return FILTERED_NAME
+        if self.is_quiet(now):
+            return FILTERED_QUIET_HOURS
+        return None
+
+    def select(self, homeworks, now):
+        """Homeworks passing the rules, filtered ones are counted.
+
+        Homeworks of quiet hours are held, the latest status of each.
+        Past the quiet hours they are selected after the ones of the
+        answer, until `queued` tells they are queued or the answer has a
+        newer status of the homework.
+        """
+        selected = []
+        quiet = []
+        for homework in homeworks:
+            reason = self.reason(homework, now)
+            if reason is None:
+                selected.append(homework)
+                continue
+            self.counters[reason] += 1
+            if reason == FILTERED_QUIET_HOURS:
+                quiet.append(homework)
+        for homework in reversed(quiet):
+            self.held.pop(homework.get('homework_name'), None)
+            self.held[homework.get('homework_name')] = homework
+        if self.held and not self.is_quiet(now):
+            for homework in selected:
+                self.held.pop(homework.get('homework_name'), None)
+            selected.extend(reversed(self.held.values()))
+        return selected
+
+    def queued(self, homework):
+        """Forget held homework once its status is queued."""
+        name = homework.get('homework_name')
+        if self.held.get(name) is homework:
+            del self.held[name]
+
+
+def load_filters(path):
+    """Filters of tenants from JSON file {tenant: rules}."""
+    with open(path, encoding='utf-8') as file:
+        rules = json.load(file)
+    return {
+        str(tenant): SubscriptionFilter.from_dict(tenant_rules)
+        for tenant, tenant_rules in rules.items()
+    }
@@ -2,25 +2,69 @@ import logging
 import os
 import sys
 import time
+from collections import namedtuple
 
 import requests
 import telegram
+import tracing
+from clock import WallClock
+from cursor import Cursor, CursorStore
+from datetime import datetime
+from digest import DigestBuffer
 from dotenv import load_dotenv
+from email.utils import parsedate_to_datetime
 from exceptions import (
+    RETRYABLE,
+    THROTTLED,
     AuthorizationError,
+    BotError,
     NotCorrectResponseError,
     RequestError,
     SendRequestError,
     StatusCodeError,
+    classify_status,
+    error_key,
 )
+from filters import load_filters
+from functools import partial
 from http import HTTPStatus
-from telegram.error import BadRequest, Unauthorized
+from lanes import DIAGNOSTIC, STATUS, Lanes
+from latency import DEFAULT_SLO, LatencyTracker
+from leases import Heartbeat, LeaseStore, idempotency_key
+from live import DEFAULT_EDIT_INTERVAL, QUEUED, UNCHANGED, LiveMessages
+from outbox import Drainer, Outbox
+from preflight import hosts_of
+from recorder import Recorder, RecordingBot
+from sinks import FanOut, make_notification, sinks_from_env
+from telegram.error import BadRequest, RetryAfter, TelegramError, Unauthorized
+from templates import (
+    BUILTIN_LOCALES,
+    MESSAGE,
+    VERDICTS,
+    Renderer,
+    load_locales,
+    merge_locales,
+)
 
 load_dotenv()
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+DIGEST_WINDOW = os.getenv('DIGEST_WINDOW')
+RECORD_FILE = os.getenv('RECORD_FILE')
+LEASE_DB = os.getenv('LEASE_DB')
+OUTBOX_PATH = os.getenv('OUTBOX_PATH')
+SUBSCRIPTION_FILTERS = os.getenv('SUBSCRIPTION_FILTERS')
+LATENCY_FILE = os.getenv('LATENCY_FILE')
+LATENCY_SLO = os.getenv('LATENCY_SLO')
+STATUS_CACHE = os.getenv('STATUS_CACHE')
+LIVE_MESSAGES = os.getenv('LIVE_MESSAGES')
+LIVE_EDIT_INTERVAL = os.getenv('LIVE_EDIT_INTERVAL')
+MESSAGE_TEMPLATES = os.getenv('MESSAGE_TEMPLATES')
+MESSAGE_LOCALE = os.getenv('MESSAGE_LOCALE')
+CURSOR_DIR = os.getenv('CURSOR_DIR')
+CURSOR_OVERLAP = os.getenv('CURSOR_OVERLAP')
 
 RETRY_PERIOD = 600
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
@@ -32,13 +76,34 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
+DEFAULT_LOCALE = 'ru'
+STATUS_MESSAGE = (
+    'Изменился статус проверки работы "{homework_name}". {verdict}'
+)
+LOCALES = {
+    **BUILTIN_LOCALES,
+    DEFAULT_LOCALE: {MESSAGE: STATUS_MESSAGE, VERDICTS: HOMEWORK_VERDICTS},
+}
+RENDERER = Renderer(LOCALES, DEFAULT_LOCALE)
+
+STATUSES = tuple(sys.intern(status) for status in HOMEWORK_VERDICTS)
+FINAL_STATUS = 'approved'
+STATUS_INDEX = {status: code for code, status in enumerate(STATUSES)}
+NOT_DICT = 'not a dict'
+NO_NAME = 'no homework_name'
+NO_STATUS = 'no status'
+UNKNOWN_STATUS = 'unknown status'
+
+BatchResult = namedtuple('BatchResult', ('valid', 'errors', 'counts'))
+
 logger = logging.getLogger(__name__)
 logger.setLevel(level=logging.DEBUG)
 handler = logging.StreamHandler(stream=sys.stdout)
 formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - [%(levelname)s] - %(message)s'
+    '%(asctime)s - %(name)s - [%(levelname)s] - [%(trace_id)s] - %(message)s'
 )
 handler.setFormatter(formatter)
+handler.addFilter(tracing.TraceIdFilter())
 logger.addHandler(handler)
 
 
@@ -60,35 +125,135 @@ def check_tokens():
             sys.exit('Force exit')
 
 
-def send_message(bot, message):
-    """Message for Telegram chat."""
+def telegram_error(error, latency):
+    """Classified exception for Telegram Bot API error."""
+    if isinstance(error, Unauthorized):
+        return AuthorizationError('Bad TOKEN authorization', latency=latency)
+    if isinstance(error, BadRequest):
+        return SendRequestError('Bad Request', latency=latency)
+    if isinstance(error, RetryAfter):
+        return SendRequestError(
+            'Flood control exceeded',
+            retry_after=error.retry_after,
+            latency=latency,
+            kind=THROTTLED
+        )
+    return SendRequestError(
+        f'Telegram is unavailable: {error}', latency=latency, kind=RETRYABLE
+    )
+
+
+@tracing.traced('send_message')
+def send_to_chat(bot, chat_id, message):
+    """Message for the given Telegram chat."""
+    started = time.monotonic()
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        bot.send_message(chat_id, message)
         logger.info(f'Bot send message: {message}')
-    except Unauthorized as err:
-        raise AuthorizationError('Bad TOKEN authorization') from err
-    except BadRequest as err:
-        raise SendRequestError('Bad Request') from err
+    except TelegramError as err:
+        raise telegram_error(err, time.monotonic() - started) from err
     else:
         logger.debug('Successful send message')
 
 
+def send_message(bot, message):
+    """Message for Telegram chat."""
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def check_bot(bot):
+    """Cached `getMe`, checks the token."""
+    started = time.monotonic()
+    try:
+        return bot.bot.username
+    except TelegramError as err:
+        raise telegram_error(err, time.monotonic() - started) from err
+
+
+def check_chat(bot, chat_id):
+    """Chat type, fails if the bot cannot reach the chat."""
+    started = time.monotonic()
+    try:
+        return bot.get_chat(chat_id).type
+    except TelegramError as err:
+        raise telegram_error(err, time.monotonic() - started) from err
+
+
+def check_practicum(fetch=None):
+    """Cheapest API request: statuses changed since now."""
+    response = (fetch or get_api_answer)(int(time.time()))
+    return f'{len(response.get("homeworks", []))} homeworks'
+
+
+def startup_checks(bot, fetch=None):
+    """Checks and hosts for `preflight.run`."""
+    checks = {
+        'telegram token': partial(check_bot, bot),
+        'telegram chat': partial(check_chat, bot, TELEGRAM_CHAT_ID),
+        'practicum token': partial(check_practicum, fetch),
+    }
+    hosts = hosts_of(ENDPOINT, getattr(bot, 'base_url', None))
+    return checks, hosts
+
+
+def parse_retry_after(headers):
+    """Seconds from `Retry-After` header, None if absent or invalid."""
+    value = (headers or {}).get('Retry-After')
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0, int(moment - time.time()))
+
+
+@tracing.traced('get_api_answer')
 def get_api_answer(timestamp):
     """Request to YandexPracticum Homework."""
+    started = time.monotonic()
     try:
         logger.info(
             f'Send request to YaHomework API. Time: {time.ctime(timestamp)}'
         )
-        response = requests.get(
-            url=ENDPOINT,
-            headers=HEADERS,
-            params={'from_date': timestamp}
-        )
-        if response.status_code != HTTPStatus.OK:
-            raise StatusCodeError('Status code different to expected')
-        return response.json()
+        with tracing.span('http.get') as span:
+            response = requests.get(
+                url=ENDPOINT,
+                headers=HEADERS,
+                params={'from_date': timestamp}
+            )
+            span.set_attribute('http.status_code', response.status_code)
+            elapsed = getattr(response, 'elapsed', None)
+            if elapsed is not None:
+                span.set_attribute(
+                    'http.time_to_headers_ms', elapsed.total_seconds() * 1000
+                )
     except requests.RequestException as err:
-        raise RequestError('Problem with Request') from err
+        raise RequestError(
+            'Problem with Request', latency=time.monotonic() - started
+        ) from err
+    return api_answer(response, time.monotonic() - started)
+
+
+def api_answer(response, latency):
+    """Decoded answer of API response, raise if it is not a correct one."""
+    if response.status_code != HTTPStatus.OK:
+        raise StatusCodeError(
+            f'Status code different to expected: {response.status_code}',
+            status_code=response.status_code,
+            retry_after=parse_retry_after(getattr(response, 'headers', None)),
+            latency=latency,
+            kind=classify_status(response.status_code)
+        )
+    try:
+        with tracing.span('response.json'):
+            return response.json()
+    except ValueError as err:
+        raise NotCorrectResponseError(
+            'Response is not JSON', latency=latency
+        ) from err
 
 
 '''
@@ -98,6 +263,7 @@ AssertionError: Функция `check_response` должна принимать
 '''
 
 
+@tracing.traced('check_response')
 def check_response(response):
     """Is correct answer to API YandexPracticum."""
     important_keys = ('homeworks', 'current_date')
@@ -119,25 +285,70 @@ def check_response(response):
         )
 
 
+def checked_status(homework):
+    """Name and status of homework, errors of `parse_status` if invalid."""
+    for key in ('status', 'homework_name'):
+        if key not in homework:
+            raise KeyError(f'Not keyname "{key}" in homework')
+    if homework['status'] not in HOMEWORK_VERDICTS:
+        raise NameError('Not correct status in homework')
+    return homework['homework_name'], homework['status']
+
+
+@tracing.traced('parse_status')
 def parse_status(homework):
     """Get status homework."""
-    important_keys = ('status', 'homework_name')
-    homework_name = homework.get('homework_name')
-    status = homework.get('status')
-    verdict = HOMEWORK_VERDICTS.get(status)
+    homework_name, status = checked_status(homework)
+    return RENDERER.render(homework_name, status, DEFAULT_LOCALE, homework)
 
-    for key in important_keys:
-        if not (key in homework):
-            raise KeyError(f'Not keyname "{key}" in homework')
-    if not (status in HOMEWORK_VERDICTS):
-        raise NameError('Not correct status in homework')
 
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+@tracing.traced('parse_status')
+def localized_status(homework, locale):
+    """`parse_status` in the locale of the tenant."""
+    homework_name, status = checked_status(homework)
+    return RENDERER.render(homework_name, status, locale, homework)
+
+
+def configure_renderer(path):
+    """Renderer with locales of the JSON file on top of built-in ones."""
+    global RENDERER
+    RENDERER = Renderer(
+        merge_locales(LOCALES, load_locales(path)), DEFAULT_LOCALE
+    )
+    return RENDERER
+
+
+def validate_homeworks(homeworks):
+    """Validate and classify a whole `homeworks` list in one pass.
+
+    Returns valid items as (index, homework_name, status code) with codes
+    indexing STATUSES, problems as (index, reason) instead of raising on
+    the first one, and number of homeworks per status code.
+    """
+    valid = []
+    errors = []
+    counts = [0] * len(STATUSES)
+    status_code = STATUS_INDEX.get
+    for index, homework in enumerate(homeworks):
+        if not isinstance(homework, dict):
+            errors.append((index, NOT_DICT))
+            continue
+        name = homework.get('homework_name')
+        status = homework.get('status')
+        code = status_code(status)
+        if name is None or code is None:
+            errors.append((index, NO_NAME if name is None else (
+                NO_STATUS if status is None else UNKNOWN_STATUS
+            )))
+            continue
+        valid.append((index, name, code))
+        counts[code] += 1
+    return BatchResult(valid, errors, counts)
 
 
 def handler_errors(stack, error, count_err=3):
     """Three (default) identical errors lead to exit from system."""
-    stack.append(error.__repr__())
+    stack.append(error_key(error))
     if len(stack) == count_err:
         if all(err == stack[0] for err in stack):
             sys.exit('Error in works Bot')
@@ -145,36 +356,400 @@ def handler_errors(stack, error, count_err=3):
             del stack[0:2]
 
 
+def retry_delay(error):
+    """Pause before next cycle, longer if the error asks to back off."""
+    if getattr(error, 'throttled', False) and error.retry_after:
+        return max(RETRY_PERIOD, error.retry_after)
+    return RETRY_PERIOD
+
+
+def deliver(bot, state, message, *key_parts):
+    """Send status message once, through the outbox if there is one."""
+    key = idempotency_key(state.tenant, message, *key_parts)
+    if state.leases is not None and not state.leases.claim(key):
+        return False
+    try:
+        return send_once(bot, state, key, message)
+    except Exception:
+        if state.leases is not None:
+            state.leases.unclaim(key)
+        raise
+
+
+def send_once(bot, state, key, message):
+    """Send claimed message, directly or through the outbox.
+
+    False if the message already waits in the outbox for a resend.
+    """
+    if state.outbox is None:
+        send_message(bot, message)
+        return True
+    if not state.outbox.put(key, TELEGRAM_CHAT_ID, message):
+        return False
+    send_message(bot, message)
+    state.outbox.ack(key)
+    return True
+
+
+def deliver_live(bot, state, homework, message):
+    """Edit the live message of homework, new message once approved."""
+    homework_name = homework['homework_name']
+    if homework.get('status') == FINAL_STATUS:
+        state.live.finish(bot, TELEGRAM_CHAT_ID, homework_name)
+        return deliver(bot, state, message, homework.get('date_updated'))
+    key = idempotency_key(state.tenant, message, homework.get('date_updated'))
+    if state.leases is not None and not state.leases.claim(key):
+        return False
+    started = time.monotonic()
+    try:
+        done = state.live.show(
+            bot, TELEGRAM_CHAT_ID, homework_name, message, state.clock.time()
+        )
+    except Exception as err:
+        if state.leases is not None:
+            state.leases.unclaim(key)
+        if isinstance(err, TelegramError):
+            raise telegram_error(err, time.monotonic() - started) from err
+        raise
+    logger.info(f'Live message of {homework_name} is {done}')
+    return done not in (QUEUED, UNCHANGED)
+
+
+def flush_live(bot, state):
+    """Send edits of live messages held back by the edit interval."""
+    started = time.monotonic()
+    try:
+        state.live.flush(bot, state.clock.time())
+    except TelegramError as err:
+        raise telegram_error(err, time.monotonic() - started) from err
+
+
+def send_digest(bot, state, homeworks, now):
+    """Collect every changed status, queue digests with elapsed window.
+
+    Digests go to the status lane, so a failed one is resent, ahead of
+    the later ones, until it is delivered; the extra sinks get them at
+    once. Update times of the statuses are part of the idempotency key,
+    so a digest repeating an earlier text is not taken for a resend.
+    """
+    digest = state.digest
+    result = validate_homeworks(homeworks)
+    for index, reason in result.errors:
+        logger.error(f'Homework #{index} is skipped: {reason}')
+    for index, homework_name, code in reversed(result.valid):
+        digest.add(
+            TELEGRAM_CHAT_ID,
+            homework_name,
+            RENDERER.render(homework_name, STATUSES[code], state.locale),
+            now,
+            homeworks[index].get('date_updated')
+        )
+    for _, text, changes in digest.pop_due(now):
+        if state.lanes.put(
+            STATUS, text, partial(deliver, bot, state, text, *changes)
+        ):
+            publish_to_sinks(state, text)
+
+
+class PollState:
+    """Mutable state of the polling loop between cycles."""
+
+    __slots__ = ('cursor', 'lanes', 'error_stack', 'digest',
+                 'clock', 'fanout', 'tenant', 'leases', 'outbox',
+                 'filter', 'latency', 'status_cache', 'live', 'locale',
+                 'cursors')
+
+    def __init__(self, timestamp, digest=None, clock=None, tenant=None,
+                 locale=None):
+        """Polling starts from `timestamp` as `from_date`."""
+        self.tenant = tenant or TELEGRAM_CHAT_ID
+        self.locale = locale
+        self.cursor = Cursor(timestamp)
+        self.error_stack = []
+        self.digest = digest
+        self.clock = clock or WallClock()
+        self.lanes = Lanes(self.clock)
+        self.fanout = None
+        self.leases = None
+        self.outbox = None
+        self.filter = None
+        self.latency = None
+        self.status_cache = None
+        self.live = None
+        self.cursors = None
+
+
+def status_moment(homework, fallback):
+    """Time of status change, `fallback` if `date_updated` is unusable."""
+    try:
+        return datetime.fromisoformat(
+            homework['date_updated'].replace('Z', '+00:00')
+        ).timestamp()
+    except (KeyError, AttributeError, ValueError):
+        return fallback
+
+
+def publish_status(state, homeworks):
+    """Share the latest valid status with other processes.
+
+    The cache is only read by others, its failure is logged and does not
+    stop the notification.
+    """
+    latest = validate_homeworks(homeworks[:1]).valid
+    fields = ()
+    if latest:
+        _, homework_name, code = latest[0]
+        fields = (
+            homework_name, STATUSES[code], status_moment(homeworks[0], None)
+        )
+    try:
+        state.status_cache.publish(state.tenant, state.clock.time(), *fields)
+    except (OSError, OverflowError, ValueError) as error:
+        logger.warning(f'Status of {state.tenant} is not cached: {error}')
+
+
+def publish_to_sinks(state, message, homework=None):
+    """Pass queued message to the extra sinks, not waiting for Telegram."""
+    if state.fanout is not None:
+        state.fanout.publish(
+            make_notification(TELEGRAM_CHAT_ID, message, homework)
+        )
+
+
+def deliver_status(bot, state, homework, message, current_date):
+    """Send status message of homework from the status lane.
+
+    Latency is measured from `date_updated`, from `current_date` of the
+    answer when the homework has no usable one.
+    """
+    if state.live is not None:
+        delivered = deliver_live(bot, state, homework, message)
+    else:
+        delivered = deliver(bot, state, message, homework.get('date_updated'))
+    if delivered and state.latency is not None:
+        state.latency.observe(
+            state.tenant,
+            state.clock.time() - status_moment(homework, current_date)
+        )
+    return delivered
+
+
+def queue_statuses(bot, state, homeworks, current_date):
+    """Queue message about changed status of the last homework."""
+    if state.live is not None:
+        flush_live(bot, state)
+    if state.filter is not None:
+        homeworks = state.filter.select(homeworks, state.clock.time())
+    if state.digest is not None:
+        send_digest(bot, state, homeworks, int(state.clock.time()))
+        queued = homeworks
+    elif homeworks:
+        homework = homeworks[0]
+        message = (
+            parse_status(homework) if state.locale is None
+            else localized_status(homework, state.locale)
+        )
+        if state.lanes.put(
+            STATUS, message,
+            partial(
+                deliver_status, bot, state, homework, message, current_date
+            )
+        ):
+            publish_to_sinks(state, message, homework)
+        queued = homeworks[:1]
+    else:
+        return
+    if state.filter is not None:
+        for homework in queued:
+            state.filter.queued(homework)
+
+
+def process_cycle(bot, state, fetch=None):
+    """One poll-to-notify cycle, returns pause before the next one."""
+    with tracing.trace('poll_cycle') as cycle:
+        cycle.set_attribute('tenant', str(state.tenant))
+        return poll_and_notify(bot, state, fetch)
+
+
+def bot_error_delay(state, error):
+    """Log failed send, exit on repeated permanent ones, return pause."""
+    if error.permanent:
+        logger.critical(error)
+        handler_errors(state.error_stack, error)
+    else:
+        logger.error(error)
+    return retry_delay(error)
+
+
+def report_failure(bot, state, error):
+    """Queue report of failed cycle, send what lanes allow, return pause."""
+    message = f'Сбой в работе программы: {error}'
+    state.lanes.put(DIAGNOSTIC, message, partial(send_message, bot, message))
+    try:
+        state.lanes.drain()
+    except BotError as err:
+        return bot_error_delay(state, err)
+    return retry_delay(error)
+
+
+def advance_cursor(state, current_date):
+    """Commit the cursor once status messages of the answer are sent."""
+    if state.lanes[STATUS].queue:
+        return
+    gap = state.cursor.commit(current_date, state.clock.time())
+    if gap:
+        logger.warning(
+            f'Caught up {gap:.0f} s without successful polls '
+            f'of tenant {state.tenant}'
+        )
+    if state.cursors is not None:
+        state.cursors.save(state.tenant, state.cursor)
+
+
+def poll_and_notify(bot, state, fetch=None):
+    """Poll API, send queued notifications and handle errors of the cycle.
+
+    Status messages and error reports go through separate lanes: a
+    failed status message is resent before any error report. Changes
+    already seen in the overlap window of the cursor are not notified.
+    """
+    if state.leases is not None and not state.leases.acquire(state.tenant):
+        logger.debug(f'Tenant {state.tenant} is polled by another replica')
+        return state.leases.ttl
+    try:
+        response = (fetch or get_api_answer)(state.cursor.from_date())
+        check_response(response)
+        homeworks = response.get('homeworks')
+        current_date = response.get('current_date', state.cursor.position)
+        state.lanes[DIAGNOSTIC].forget_last()
+        if state.status_cache is not None:
+            publish_status(state, homeworks)
+        fresh = state.cursor.fresh(homeworks)
+        queue_statuses(bot, state, fresh, current_date)
+        state.cursor.remember(fresh, status_moment, current_date)
+        state.lanes.drain()
+        advance_cursor(state, current_date)
+    except BotError as err:
+        return bot_error_delay(state, err)
+    except Exception as error:
+        logger.error(error)
+        return max(retry_delay(error), report_failure(bot, state, error))
+    return RETRY_PERIOD
+
+
+def run_polling(bot, state, cycles=None, fetch=None):
+    """Polling loop driven by the clock of the state.
+
+    Unlike `main()` it stops after `cycles` cycles, so a virtual clock
+    runs weeks of polling in a moment.
+    """
+    done = 0
+    while cycles is None or done < cycles:
+        delay = process_cycle(bot, state, fetch)
+        done += 1
+        state.clock.sleep(delay)
+    return done
+
+
+def run_scheduled(bot, pollers, scheduler, until=None, pipeline=None):
+    """Poll many tenants, each woken by the scheduler when it is due.
+
+    `pollers` maps tenant key to (state, fetch). Tenants not scheduled
+    yet are spread over one `RETRY_PERIOD`, but those whose cursor lags
+    behind after downtime catch up at once. Stops when nothing is due
+    before `until` moment of the scheduler clock.
+
+    With a `backpressure.Pipeline` starting with a fetch stage, a due
+    tenant is submitted to it instead of polled here, and its next turn
+    comes after `pipeline.delay`, stretched while the queues are full.
+    """
+    now = scheduler.clock.time()
+    new = [key for key in pollers if key not in scheduler]
+    for key in new:
+        if pollers[key][0].cursor.lag(now):
+            scheduler.schedule(key, 0)
+    scheduler.spread(
+        [key for key in new if key not in scheduler], RETRY_PERIOD
+    )
+    done = 0
+    while True:
+        moment = scheduler.next_due()
+        if moment is None or until is not None and moment >= until:
+            return done
+        for key in scheduler.wait():
+            if pipeline is None:
+                state, fetch = pollers[key]
+                delay = process_cycle(bot, state, fetch)
+            else:
+                pipeline.submit(key)
+                delay = pipeline.delay(RETRY_PERIOD)
+            scheduler.schedule(key, delay)
+            done += 1
+
+
+def configure_state(bot, state):
+    """Attach optional components enabled by environment variables."""
+    if MESSAGE_TEMPLATES:
+        configure_renderer(MESSAGE_TEMPLATES)
+    state.locale = state.locale or MESSAGE_LOCALE
+    if DIGEST_WINDOW:
+        state.digest = DigestBuffer(int(DIGEST_WINDOW))
+    if LEASE_DB:
+        state.leases = LeaseStore(LEASE_DB)
+        Heartbeat(state.leases, [state.tenant]).start()
+    if SUBSCRIPTION_FILTERS:
+        state.filter = load_filters(SUBSCRIPTION_FILTERS).get(
+            str(state.tenant)
+        )
+    if OUTBOX_PATH:
+        state.outbox = Outbox(OUTBOX_PATH)
+        Drainer(state.outbox, partial(send_to_chat, bot)).start()
+    if LATENCY_FILE:
+        state.latency = LatencyTracker(
+            int(LATENCY_SLO or DEFAULT_SLO), LATENCY_FILE
+        )
+    if LIVE_MESSAGES:
+        state.live = LiveMessages(
+            LIVE_MESSAGES, int(LIVE_EDIT_INTERVAL or DEFAULT_EDIT_INTERVAL)
+        )
+    if STATUS_CACHE:
+        from status_cache import StatusCache
+        state.status_cache = StatusCache(STATUS_CACHE)
+    sinks = sinks_from_env(bot=bot)
+    if sinks:
+        state.fanout = FanOut(sinks)
+    return configure_cursor(state)
+
+
+def configure_cursor(state):
+    """Overlap of the cursor and the directory it is resumed from."""
+    if CURSOR_OVERLAP:
+        state.cursor.overlap = int(CURSOR_OVERLAP)
+    if CURSOR_DIR:
+        state.cursors = CursorStore(CURSOR_DIR)
+        state.cursor = state.cursors.load(state.tenant, state.cursor)
+    return state
+
+
+def prepare(bot):
+    """Bot, state and fetch function of the polling loop."""
+    state = configure_state(bot, PollState(int(time.time())))
+    fetch = None
+    if RECORD_FILE:
+        recorder = Recorder(RECORD_FILE)
+        bot = RecordingBot(bot, recorder)
+        fetch = recorder.wrap_fetch(get_api_answer)
+    return bot, state, fetch
+
+
 def main():
     """Base logic Bot."""
     check_tokens()
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    message_storage = ''
-    error_stack = []
+    bot, state, fetch = prepare(bot)
     while True:
-        try:
-            response = get_api_answer(timestamp)
-            check_response(response)
-            homeworks = response.get('homeworks')
-            timestamp = response.get('current_date', timestamp)
-            if homeworks:
-                homework = homeworks[0]
-                message = parse_status(homework)
-                if message_storage != message:
-                    send_message(bot, message)
-                    message_storage = message
-        except (AuthorizationError, SendRequestError) as err:
-            logger.critical(err)
-            handler_errors(error_stack, err)
-        except Exception as error:
-            message_err = f'Сбой в работе программы: {error}'
-            logger.error(error)
-            if message_storage != message_err:
-                send_message(bot, message_err)
-                message_storage = message_err
-        finally:
-            time.sleep(RETRY_PERIOD)
+        delay = process_cycle(bot, state, fetch)
+        time.sleep(delay)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,156 @@
+import logging
+import threading
+from collections import Counter
+
+from exceptions import BotError
+from latency import QUANTILES, QuantileSketch
+
+logger = logging.getLogger('homework.lanes')
+
+STATUS = 'status'
+DIAGNOSTIC = 'diagnostic'
+DIAGNOSTIC_QUEUE = 10
+
+
+class LaneStats:
+    """Sends of one lane over all tenants: counts and latency."""
+
+    def __init__(self):
+        self.latency = QuantileSketch()
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, event):
+        with self._lock:
+            self.counts[event] += 1
+
+    def sent(self, seconds):
+        with self._lock:
+            self.counts['sent'] += 1
+            self.latency.add(max(0.0, seconds))
+
+    def report(self):
+        with self._lock:
+            report = {event: self.counts[event] for event in (
+                'sent', 'failed', 'duplicates', 'dropped'
+            )}
+            for q in QUANTILES:
+                report[f'p{q * 100:g}'] = self.latency.quantile(q)
+        return report
+
+
+STATS = {}
+
+
+def lane_stats(name):
+    """Stats shared by lanes of the name."""
+    stats = STATS.get(name)
+    if stats is None:
+        stats = STATS.setdefault(name, LaneStats())
+    return stats
+
+
+class Lane:
+    """Queue of one kind of messages of a tenant with its own dedup.
+
+    A message equal to the last sent or to a queued one is a duplicate.
+    A drain sends at most `quota` messages (all if None). A send failed
+    for a retryable or throttled reason leaves the message first in the
+    lane for the next drain, a permanently rejected one is dropped, so it
+    does not block the later ones; a `fatal` lane re-raises the error,
+    others only log it. Latency from queueing
+    to the end of the send goes to the stats of the lane name.
+    """
+
+    __slots__ = ('name', 'quota', 'fatal', 'size', 'last', 'queue', 'stats')
+
+    def __init__(self, name, quota=None, fatal=True, size=None, stats=None):
+        self.name = name
+        self.quota = quota
+        self.fatal = fatal
+        self.size = size
+        self.last = None
+        self.queue = []
+        self.stats = stats or lane_stats(name)
+
+    def put(self, text, send, now):
+        """Queue `send` of text unless it is a duplicate."""
+        if text == self.last or any(text == item[0] for item in self.queue):
+            self.stats.count('duplicates')
+            return False
+        if self.size is not None and len(self.queue) >= self.size:
+            del self.queue[0]
+            self.stats.count('dropped')
+        self.queue.append((text, send, now))
+        return True
+
+    def forget_last(self):
+        """Let the next message equal to the last sent one through."""
+        self.last = None
+
+    def drain(self, clock):
+        """Send queued messages in order, return how many were sent."""
+        done = 0
+        while self.queue and (self.quota is None or done < self.quota):
+            text, send, queued = self.queue[0]
+            try:
+                send()
+            except BotError as err:
+                self.stats.count('failed')
+                if err.permanent:
+                    del self.queue[0]
+                    self.stats.count('dropped')
+                if self.fatal:
+                    raise
+                logger.error(f'{self.name} message is not sent: {err}')
+                break
+            del self.queue[0]
+            self.last = text
+            self.stats.sent(clock.monotonic() - queued)
+            done += 1
+        return done
+
+
+def default_lanes():
+    """Status transitions first, then one error report per drain."""
+    return (
+        Lane(STATUS),
+        Lane(DIAGNOSTIC, quota=1, fatal=False, size=DIAGNOSTIC_QUEUE),
+    )
+
+
+class Lanes:
+    """Delivery lanes of a tenant, drained in priority order.
+
+    A lane is drained only when all lanes before it are empty, so an
+    error report never goes ahead of a status change, also one waiting
+    after a failed send.
+    """
+
+    __slots__ = ('clock', 'lanes')
+
+    def __init__(self, clock, lanes=None):
+        self.clock = clock
+        self.lanes = {lane.name: lane for lane in lanes or default_lanes()}
+
+    def __getitem__(self, name):
+        return self.lanes[name]
+
+    def put(self, name, text, send):
+        return self.lanes[name].put(text, send, self.clock.monotonic())
+
+    def drain(self):
+        """Send what lanes allow, return number of sent messages."""
+        done = 0
+        for lane in self.lanes.values():
+            done += lane.drain(self.clock)
+            if lane.queue:
+                break
+        return done
+
+    def report(self):
+        """Stats of every lane with messages queued for the tenant."""
+        return {
+            name: dict(lane.stats.report(), queued=len(lane.queue))
+            for name, lane in self.lanes.items()
+        }
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import socket
+import sqlite3
+import threading
+
+from clock import WallClock
+
+DEFAULT_TTL = 30
+KEEP_SENT = 24 * 60 * 60
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS leases ('
+    'tenant TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS sent ('
+    'key TEXT PRIMARY KEY, owner TEXT NOT NULL, at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS sent_at ON sent (at)',
+)
+
+
+def default_owner():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def idempotency_key(*parts):
+    """Short stable key of a notification."""
+    return hashlib.sha1(
+        '\x1f'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+class LeaseStore:
+    """Tenant ownership leases and sent message keys shared by replicas.
+
+    Lives in a SQLite file on a volume shared by all workers. A tenant is
+    polled only by the holder of its lease; a lease not renewed for `ttl`
+    seconds is taken over by another replica. Every notification is
+    claimed by key before sending and the claim is given back if the
+    send fails, so a message survives a failover at most once and a
+    failed one is retried.
+    """
+
+    def __init__(self, path, owner=None, ttl=DEFAULT_TTL, clock=None):
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.clock = clock or WallClock()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=ttl, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        for statement in SCHEMA:
+            self._connection.execute(statement)
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params)
+
+    def acquire(self, tenant):
+        """Take or renew the lease, True if this replica holds it."""
+        now = self.clock.time()
+        cursor = self._execute(
+            'INSERT INTO leases (tenant, owner, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT (tenant) DO UPDATE SET '
+            'owner = excluded.owner, expires = excluded.expires '
+            'WHERE leases.owner = excluded.owner OR leases.expires < ?',
+            (tenant, self.owner, now + self.ttl, now)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, tenant):
+        self._execute(
+            'DELETE FROM leases WHERE tenant = ? AND owner = ?',
+            (tenant, self.owner)
+        )
+
+    def holder(self, tenant):
+        """Owner of a live lease or None."""
+        row = self._execute(
+            'SELECT owner FROM leases WHERE tenant = ? AND expires >= ?',
+            (tenant, self.clock.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def leases(self):
+        """All leases as (tenant, owner, expires), expired ones too."""
+        return self._execute(
+            'SELECT tenant, owner, expires FROM leases ORDER BY tenant'
+        ).fetchall()
+
+    def sent_count(self):
+        return self._execute('SELECT COUNT(*) FROM sent').fetchone()[0]
+
+    def claim(self, key):
+        """Reserve notification key, False if it is already sent."""
+        cursor = self._execute(
+            'INSERT OR IGNORE INTO sent (key, owner, at) VALUES (?, ?, ?)',
+            (key, self.owner, self.clock.time())
+        )
+        return cursor.rowcount == 1
+
+    def unclaim(self, key):
+        """Give back a key of this replica whose send has failed."""
+        self._execute(
+            'DELETE FROM sent WHERE key = ? AND owner = ?', (key, self.owner)
+        )
+
+    def forget_sent(self, older_than):
+        """Drop keys claimed more than `older_than` seconds ago."""
+        self._execute(
+            'DELETE FROM sent WHERE at < ?',
+            (self.clock.time() - older_than,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class Heartbeat:
+    """Keep leases of tenants renewed from a background thread.
+
+    Every beat also drops sent keys older than `keep_sent` seconds.
+    """
+
+    def __init__(self, store, tenants, interval=None, keep_sent=KEEP_SENT):
+        self.store = store
+        self.tenants = list(tenants)
+        self.interval = interval or store.ttl / 3
+        self.keep_sent = keep_sent
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._beat, name='lease-heartbeat', daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            self.beat()
+
+    def beat(self):
+        for tenant in self.tenants:
+            self.store.acquire(tenant)
+        self.store.forget_sent(self.keep_sent)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
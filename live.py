@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+
+from telegram.error import BadRequest, TelegramError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EDIT_INTERVAL = 60
+SENT = 'sent'
+EDITED = 'edited'
+QUEUED = 'queued'
+UNCHANGED = 'unchanged'
+
+
+class LiveMessages:
+    """One pinned message per homework, edited on every status change.
+
+    Message ids are kept in a JSON file, so a restart edits the same
+    messages. An edit sooner than `edit_interval` after the previous one
+    is queued; a newer text replaces the queued one and `flush` sends it
+    when the interval is over, so a burst of changes costs one edit.
+    """
+
+    def __init__(self, path=None, edit_interval=DEFAULT_EDIT_INTERVAL):
+        self.path = path
+        self.edit_interval = edit_interval
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.entries = json.load(file)
+
+    @staticmethod
+    def key(chat_id, homework_name):
+        return f'{chat_id}:{homework_name}'
+
+    def message_id(self, chat_id, homework_name):
+        entry = self.entries.get(self.key(chat_id, homework_name))
+        return entry and entry['message_id']
+
+    def show(self, bot, chat_id, homework_name, text, now):
+        """Put text in the live message of homework, return what was done."""
+        key = self.key(chat_id, homework_name)
+        entry = self.entries.get(key)
+        if entry is None:
+            return self._post(bot, chat_id, key, text, now)
+        if text == entry['text']:
+            if entry['pending'] is not None:
+                entry['pending'] = None
+                self._save()
+            return UNCHANGED
+        if now - entry['edited'] < self.edit_interval:
+            entry['pending'] = text
+            self._save()
+            return QUEUED
+        return self._edit(bot, chat_id, key, text, now)
+
+    def flush(self, bot, now):
+        """Send queued edits with elapsed interval, return their number."""
+        done = 0
+        for key, entry in list(self.entries.items()):
+            if (
+                entry['pending'] is not None
+                and now - entry['edited'] >= self.edit_interval
+            ):
+                self._edit(bot, entry['chat_id'], key, entry['pending'], now)
+                done += 1
+        return done
+
+    def finish(self, bot, chat_id, homework_name):
+        """Unpin and forget the live message of a finished homework."""
+        entry = self.entries.pop(self.key(chat_id, homework_name), None)
+        if entry is None:
+            return
+        self._save()
+        try:
+            bot.unpin_chat_message(chat_id, message_id=entry['message_id'])
+        except TelegramError as err:
+            logger.warning(f'Live message is not unpinned: {err}')
+
+    def _post(self, bot, chat_id, key, text, now):
+        message = bot.send_message(chat_id, text)
+        try:
+            bot.pin_chat_message(
+                chat_id, message.message_id, disable_notification=True
+            )
+        except TelegramError as err:
+            logger.warning(f'Live message is not pinned: {err}')
+        self.entries[key] = {
+            'chat_id': chat_id, 'message_id': message.message_id,
+            'text': text, 'edited': now, 'pending': None,
+        }
+        self._save()
+        return SENT
+
+    def _edit(self, bot, chat_id, key, text, now):
+        entry = self.entries[key]
+        try:
+            bot.edit_message_text(
+                text, chat_id=chat_id, message_id=entry['message_id']
+            )
+        except BadRequest as err:
+            if 'not modified' not in err.message.lower():
+                logger.warning(f'Live message is not edited: {err}')
+                del self.entries[key]
+                return self._post(bot, chat_id, key, text, now)
+        entry.update(text=text, edited=now, pending=None)
+        self._save()
+        return EDITED
+
+    def _save(self):
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, ensure_ascii=False)
+        os.replace(temporary, self.path)
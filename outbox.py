@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+import random
+import threading
+from collections import OrderedDict, deque
+
+from clock import WallClock
+
+logger = logging.getLogger(__name__)
+
+FIRST_RETRY = 60
+MAX_BACKOFF = 3600
+MAX_PERMANENT_ATTEMPTS = 3
+REMEMBERED_ACKS = 1000
+
+
+def read_log(path):
+    """Records of outbox file in the order of writing."""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning('Torn record in outbox is skipped')
+
+
+class OutboxEntry:
+    __slots__ = ('key', 'chat_id', 'text', 'attempts', 'next_attempt')
+
+    def __init__(self, key, chat_id, text, next_attempt):
+        self.key = key
+        self.chat_id = chat_id
+        self.text = text
+        self.attempts = 0
+        self.next_attempt = next_attempt
+
+
+class Batch:
+    """Records written by one fsync and the outcome of the write."""
+
+    __slots__ = ('lines', 'done', 'error')
+
+    def __init__(self):
+        self.lines = []
+        self.done = False
+        self.error = None
+
+
+class Outbox:
+    """Disk-backed log of messages, written before sending.
+
+    `put` returns only when the record is on disk. Records of concurrent
+    callers are written and fsynced by one flusher thread as a batch, so
+    many puts share one fsync; if the write fails, `put` raises its error
+    and the message is not kept. `ack` is not waited for: a lost ack
+    means one more delivery, which is what at-least-once allows.
+    """
+
+    def __init__(self, path, clock=None, first_retry=FIRST_RETRY):
+        self.path = path
+        self.clock = clock or WallClock()
+        self.first_retry = first_retry
+        self.pending = OrderedDict()
+        self.acked = deque(maxlen=REMEMBERED_ACKS)
+        self._acked_keys = set()
+        self._cond = threading.Condition()
+        self._batch = Batch()
+        self._torn = False
+        self._closed = False
+        self._load()
+        self._compact()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name='outbox-flusher', daemon=True
+        )
+        self._flusher.start()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        now = self.clock.time()
+        for record in read_log(self.path):
+            if record['op'] == 'put':
+                self.pending[record['key']] = OutboxEntry(
+                    record['key'], record['chat_id'], record['text'], now
+                )
+            else:
+                self.pending.pop(record['key'], None)
+                self._remember(record['key'])
+
+    def _remember(self, key):
+        if len(self.acked) == self.acked.maxlen:
+            self._acked_keys.discard(self.acked[0])
+        self.acked.append(key)
+        self._acked_keys.add(key)
+
+    def _compact(self):
+        """Rewrite the log with pending messages and recent acks only."""
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            for key in self.acked:
+                file.write(self._line({'op': 'ack', 'key': key}))
+            for entry in self.pending.values():
+                file.write(self._line({
+                    'op': 'put', 'key': entry.key,
+                    'chat_id': entry.chat_id, 'text': entry.text,
+                }))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+
+    @staticmethod
+    def _line(record):
+        return json.dumps(
+            record, ensure_ascii=False, separators=(',', ':')
+        ) + '\n'
+
+    def _append(self, record, durable):
+        with self._cond:
+            if self._closed:
+                raise ValueError('Outbox is closed')
+            batch = self._batch
+            batch.lines.append(self._line(record))
+            self._cond.notify_all()
+            while durable and not batch.done:
+                self._cond.wait()
+        if durable and batch.error is not None:
+            raise batch.error
+
+    def _write(self, lines):
+        """Write and fsync lines, a line torn by a failed write ends first."""
+        if self._torn:
+            lines.insert(0, '\n')
+        self._torn = True
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._torn = False
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._batch.lines and not self._closed:
+                    self._cond.wait()
+                if not self._batch.lines:
+                    return
+                batch, self._batch = self._batch, Batch()
+            try:
+                self._write(batch.lines)
+            except OSError as error:
+                logger.error(f'Outbox write failed: {error}')
+                batch.error = error
+            with self._cond:
+                batch.done = True
+                self._cond.notify_all()
+
+    def put(self, key, chat_id, text):
+        """Store message durably. False if the key is already known."""
+        with self._cond:
+            if key in self.pending or key in self._acked_keys:
+                return False
+            self.pending[key] = OutboxEntry(
+                key, chat_id, text, self.clock.time() + self.first_retry
+            )
+        try:
+            self._append(
+                {'op': 'put', 'key': key, 'chat_id': chat_id, 'text': text},
+                durable=True
+            )
+        except OSError:
+            with self._cond:
+                self.pending.pop(key, None)
+            raise
+        return True
+
+    def ack(self, key):
+        with self._cond:
+            if self.pending.pop(key, None) is None:
+                return
+            self._remember(key)
+        self._append({'op': 'ack', 'key': key}, durable=False)
+
+    def postpone(self, entry, pause):
+        """Count failed attempt of entry, retry it after pause seconds."""
+        with self._cond:
+            entry.attempts += 1
+            entry.next_attempt = self.clock.time() + pause
+
+    def due(self):
+        """Pending entries whose retry time has come."""
+        now = self.clock.time()
+        with self._cond:
+            return [
+                entry for entry in self.pending.values()
+                if entry.next_attempt <= now
+            ]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+
+def backoff(attempts, base=FIRST_RETRY, limit=MAX_BACKOFF):
+    """Exponential pause with jitter before the next attempt."""
+    return min(limit, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+class Drainer:
+    """Resend pending outbox messages until they are acknowledged.
+
+    `send(chat_id, text)` raises on failure. Errors marked `permanent`
+    are given up after MAX_PERMANENT_ATTEMPTS attempts.
+    """
+
+    def __init__(self, outbox, send, interval=5):
+        self.outbox = outbox
+        self.send = send
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='outbox-drainer', daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def drain(self):
+        """Attempt every due entry once, return number of delivered."""
+        delivered = 0
+        for entry in self.outbox.due():
+            try:
+                self.send(entry.chat_id, entry.text)
+            except Exception as error:
+                attempts = entry.attempts + 1
+                if (
+                    getattr(error, 'permanent', False)
+                    and attempts >= MAX_PERMANENT_ATTEMPTS
+                ):
+                    logger.error(f'Message {entry.key} is dropped: {error}')
+                    self.outbox.ack(entry.key)
+                    continue
+                self.outbox.postpone(entry, max(
+                    backoff(attempts),
+                    getattr(error, 'retry_after', None) or 0
+                ))
+                logger.warning(f'Message {entry.key} is not sent: {error}')
+            else:
+                self.outbox.ack(entry.key)
+                delivered += 1
+        return delivered
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,75 @@
+import logging
+import socket
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from exceptions import ClassifiedError
+
+logger = logging.getLogger(__name__)
+
+Check = namedtuple('Check', ('name', 'ok', 'permanent', 'latency', 'detail'))
+
+
+class Readiness(namedtuple('Readiness', ('checks', 'seconds'))):
+    """Outcome of the startup checks."""
+
+    __slots__ = ()
+
+    @property
+    def ready(self):
+        return all(check.ok for check in self.checks)
+
+    @property
+    def fatal(self):
+        """Failed checks that retrying will not fix, e.g. a bad token."""
+        return [check for check in self.checks if check.permanent]
+
+
+def run_check(name, func, *args):
+    """Run one check and describe how it went."""
+    started = time.monotonic()
+    try:
+        detail = func(*args)
+    except ClassifiedError as err:
+        return Check(name, False, err.permanent,
+                     time.monotonic() - started, str(err))
+    except Exception as error:
+        return Check(name, False, False, time.monotonic() - started,
+                     repr(error))
+    return Check(name, True, False, time.monotonic() - started, detail)
+
+
+def resolve(host):
+    """Addresses of host, a DNS failure is reported apart from the checks."""
+    addresses = socket.getaddrinfo(host, 443, proto=socket.IPPROTO_TCP)
+    return sorted({address[4][0] for address in addresses})
+
+
+def hosts_of(*urls):
+    return sorted({urlsplit(url).hostname for url in urls if url})
+
+
+def run(checks, hosts=(), workers=8):
+    """Resolve hosts, then run `checks` concurrently.
+
+    `checks` maps check name to a callable. DNS goes first, so a host
+    that does not resolve shows as such, not as failed checks.
+    """
+    started = time.monotonic()
+    with ThreadPoolExecutor(workers, thread_name_prefix='preflight') as pool:
+        resolved = list(pool.map(
+            lambda host: run_check(f'dns {host}', resolve, host), hosts
+        ))
+        verified = list(pool.map(
+            lambda item: run_check(*item), checks.items()
+        ))
+    readiness = Readiness(resolved + verified, time.monotonic() - started)
+    for check in readiness.checks:
+        if check.ok:
+            logger.info(f'Preflight {check.name}: ok in '
+                        f'{check.latency * 1000:.0f} ms')
+        else:
+            logger.error(f'Preflight {check.name}: {check.detail}')
+    return readiness
@@ -0,0 +1,82 @@
+import json
+import os
+import re
+import threading
+
+from clock import WallClock
+from exceptions import ClassifiedError
+
+REDACTED = '<redacted>'
+BOT_TOKEN_PATTERN = re.compile(r'\d{5,}:[\w-]{20,}')
+SECRET_VARIABLES = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN')
+
+
+def redact(text, secrets=()):
+    """Hide tokens in serialized record."""
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, REDACTED)
+    return BOT_TOKEN_PATTERN.sub(REDACTED, text)
+
+
+class Recorder:
+    """Append API answers and sent messages to a JSONL file.
+
+    Record keys are short to keep long recordings compact:
+    `t` - wall time, `k` - kind (`get`, `err`, `send`), `ts` - `from_date`
+    of the request, `r` - API answer, `e`/`m`/`s`/`ra`/`kd` - error class,
+    message, status code, Retry-After and retry class, `c` - chat id.
+    """
+
+    def __init__(self, path, clock=None, secrets=None):
+        self.path = path
+        self.clock = clock or WallClock()
+        if secrets is None:
+            secrets = [os.getenv(name) for name in SECRET_VARIABLES]
+        self.secrets = tuple(secret for secret in secrets if secret)
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        record['t'] = self.clock.time()
+        line = redact(
+            json.dumps(record, ensure_ascii=False, separators=(',', ':')),
+            self.secrets
+        )
+        with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+    def wrap_fetch(self, fetch):
+        """Fetch function that records answers and errors."""
+        def recorded_fetch(timestamp):
+            try:
+                response = fetch(timestamp)
+            except ClassifiedError as err:
+                self.write({
+                    'k': 'err',
+                    'ts': timestamp,
+                    'e': type(err).__name__,
+                    'm': str(err),
+                    's': err.status_code,
+                    'ra': err.retry_after,
+                    'kd': err.kind,
+                })
+                raise
+            self.write({'k': 'get', 'ts': timestamp, 'r': response})
+            return response
+        return recorded_fetch
+
+
+class RecordingBot:
+    """Bot proxy recording every sent message."""
+
+    def __init__(self, bot, recorder):
+        self._bot = bot
+        self._recorder = recorder
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        result = self._bot.send_message(chat_id, text, *args, **kwargs)
+        self._recorder.write({'k': 'send', 'c': chat_id, 'm': text})
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._bot, name)
@@ -0,0 +1,86 @@
+import json
+import time
+from collections import namedtuple
+from itertools import zip_longest
+
+import exceptions
+from clock import VirtualClock
+
+ReplayReport = namedtuple(
+    'ReplayReport',
+    ('cycles', 'sent', 'expected', 'mismatches', 'virtual_seconds',
+     'wall_seconds')
+)
+
+
+def load_recording(path):
+    """Records of JSONL recording in the order of writing."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def restore_error(record):
+    """Exception equal to the recorded one."""
+    error_class = getattr(exceptions, record['e'], exceptions.RequestError)
+    return error_class(
+        record['m'], status_code=record.get('s'),
+        retry_after=record.get('ra'), kind=record.get('kd')
+    )
+
+
+class ReplayBot:
+    """Bot stand-in collecting sent messages with virtual send time."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        self.sent.append((self.clock.time(), chat_id, text))
+
+
+def replay(path, speed=None, digest_window=None):
+    """Feed recorded traffic through the polling cycle of `homework`.
+
+    Virtual time jumps between recorded polls, so a day of traffic takes
+    milliseconds. With `speed` (e.g. 100 or 1000) the pauses are also
+    slept for real, scaled down by that factor.
+    """
+    import homework
+    from digest import DigestBuffer
+
+    records = load_recording(path)
+    polls = [record for record in records if record['k'] in ('get', 'err')]
+    expected = [record['m'] for record in records if record['k'] == 'send']
+    if not polls:
+        return ReplayReport(0, [], expected, [], 0, 0)
+    clock = VirtualClock(polls[0]['t'])
+    bot = ReplayBot(clock)
+    state = homework.PollState(polls[0]['ts'], clock=clock)
+    if digest_window is not None:
+        state.digest = DigestBuffer(digest_window)
+    answers = iter(polls)
+
+    def fetch(timestamp):
+        record = next(answers)
+        if record['k'] == 'err':
+            raise restore_error(record)
+        return record['r']
+
+    started = time.monotonic()
+    for poll in polls:
+        pause = poll['t'] - clock.time()
+        if speed and pause > 0:
+            time.sleep(pause / speed)
+        clock.advance_to(poll['t'])
+        homework.process_cycle(bot, state, fetch)
+    sent = [text for _, _, text in bot.sent]
+    mismatches = [
+        (index, want, got)
+        for index, (want, got) in enumerate(zip_longest(expected, sent))
+        if want != got
+    ]
+    return ReplayReport(
+        len(polls), sent, expected, mismatches,
+        clock.time() - polls[0]['t'], time.monotonic() - started
+    )
@@ -0,0 +1,100 @@
+import heapq
+import itertools
+import random
+
+from clock import WallClock
+
+DEFAULT_JITTER = 0.1
+REMOVED = object()
+
+
+class Scheduler:
+    """Wake-up moments of tenants in a min-heap.
+
+    Sleeping happens once for all tenants, until the earliest one is due.
+    Reschedule is a push, cancel only marks the heap entry, so both cost
+    O(log n); marked entries are dropped when they outnumber live ones.
+    A delay is stretched by up to `jitter` of itself, so tenants polled at
+    the same moment drift apart instead of waking as a herd each period.
+    """
+
+    def __init__(self, clock=None, jitter=DEFAULT_JITTER, rng=None):
+        self.clock = clock or WallClock()
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def schedule(self, key, delay):
+        """Wake key after `delay` seconds plus jitter, replacing its turn."""
+        if self.jitter:
+            delay += delay * self.jitter * self.rng.random()
+        self.schedule_at(key, self.clock.monotonic() + delay)
+
+    def schedule_at(self, key, moment):
+        self.cancel(key)
+        entry = [moment, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def spread(self, keys, period):
+        """Schedule keys evenly over one period instead of all at once."""
+        keys = list(keys)
+        start = self.clock.monotonic()
+        for number, key in enumerate(keys):
+            self.schedule_at(key, start + period * number / len(keys))
+
+    def cancel(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[2] = REMOVED
+        self._stale += 1
+        if self._stale > len(self._entries):
+            self._heap = [
+                item for item in self._heap if item[2] is not REMOVED
+            ]
+            heapq.heapify(self._heap)
+            self._stale = 0
+        return True
+
+    def next_due(self):
+        """Earliest wake-up moment or None if nothing is scheduled."""
+        heap = self._heap
+        while heap and heap[0][2] is REMOVED:
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now=None):
+        """Keys due by `now` in due order, they leave the schedule."""
+        if now is None:
+            now = self.clock.monotonic()
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            key = heapq.heappop(heap)[2]
+            if key is REMOVED:
+                self._stale -= 1
+                continue
+            del self._entries[key]
+            due.append(key)
+        return due
+
+    def wait(self):
+        """Sleep until the earliest key is due and return due keys."""
+        moment = self.next_due()
+        if moment is None:
+            return []
+        pause = moment - self.clock.monotonic()
+        if pause > 0:
+            self.clock.sleep(pause)
+        return self.pop_due(max(moment, self.clock.monotonic()))
@@ -0,0 +1,141 @@
+import random
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import homework
+from clock import ScaledClock, VirtualClock
+from replay import ReplayBot
+from scheduler import Scheduler
+
+SECONDS_IN_DAY = 24 * 60 * 60
+NEXT_STATUS = {
+    None: ('reviewing',),
+    'reviewing': ('rejected', 'approved'),
+    'rejected': ('reviewing',),
+}
+
+SimulationReport = namedtuple(
+    'SimulationReport',
+    ('tenants', 'cycles', 'sent', 'virtual_seconds', 'wall_seconds')
+)
+ClockComparison = namedtuple(
+    'ClockComparison', ('same_messages', 'max_drift', 'cycles')
+)
+
+
+class SimulatedPracticum:
+    """Practicum API stand-in reviewing homeworks of one student."""
+
+    def __init__(self, clock, rng, change_rate):
+        self.clock = clock
+        self.rng = rng
+        self.change_rate = change_rate
+        self.status = None
+        self.lesson = 1
+        self.polled_at = clock.time()
+
+    def __call__(self, timestamp):
+        homeworks = []
+        now = self.clock.time()
+        if self.rng.random() < self.change_rate:
+            self.status = self.rng.choice(NEXT_STATUS[self.status])
+            changed = self.rng.uniform(self.polled_at, now)
+            homeworks.append({
+                'homework_name': f'hw{self.lesson}',
+                'status': self.status,
+                'date_updated': datetime.fromtimestamp(
+                    changed, timezone.utc
+                ).isoformat().replace('+00:00', 'Z'),
+            })
+            if self.status == 'approved':
+                self.lesson += 1
+                self.status = None
+        self.polled_at = now
+        return {'homeworks': homeworks, 'current_date': int(now)}
+
+
+class CountingBot:
+    """Bot stand-in counting sent messages only."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        self.sent += 1
+
+
+@contextmanager
+def quiet_logger():
+    """Mute bot logging, per message records dominate big simulations."""
+    disabled = homework.logger.disabled
+    homework.logger.disabled = True
+    try:
+        yield
+    finally:
+        homework.logger.disabled = disabled
+
+
+def simulate(tenants=1000, days=7, change_rate=0.05, seed=0, clock=None,
+             jitter=0.0, latency=None):
+    """Poll many simulated students on a virtual clock.
+
+    Tenants wake through one scheduler, spread over the polling period.
+    A `LatencyTracker` passed as `latency` gets delays of notifications.
+    """
+    clock = clock or VirtualClock()
+    rng = random.Random(seed)
+    bot = CountingBot()
+    pollers = {
+        tenant: (
+            homework.PollState(int(clock.time()), clock=clock),
+            SimulatedPracticum(clock, random.Random(rng.random()),
+                               change_rate),
+        )
+        for tenant in range(tenants)
+    }
+    for state, _ in pollers.values():
+        state.latency = latency
+    scheduler = Scheduler(clock, jitter, random.Random(seed))
+    virtual_start = clock.time()
+    started = time.monotonic()
+    with quiet_logger():
+        cycles = homework.run_scheduled(
+            bot, pollers, scheduler,
+            until=clock.monotonic() + days * SECONDS_IN_DAY
+        )
+    clock.advance_to(virtual_start + days * SECONDS_IN_DAY)
+    return SimulationReport(
+        tenants, cycles, bot.sent,
+        clock.time() - virtual_start, time.monotonic() - started
+    )
+
+
+def compare_clocks(cycles=20, factor=60000, change_rate=0.5, seed=0):
+    """Run the same polling on virtual and accelerated wall clock.
+
+    Drift is the largest difference of send moments in simulated seconds,
+    it grows with `factor` because of real sleep overshoot.
+    """
+    timelines = []
+    for clock in (VirtualClock(), ScaledClock(factor, start=0)):
+        bot = ReplayBot(clock)
+        state = homework.PollState(0, clock=clock)
+        fetch = SimulatedPracticum(clock, random.Random(seed), change_rate)
+        with quiet_logger():
+            homework.run_polling(bot, state, cycles, fetch)
+        timelines.append(bot.sent)
+    virtual, wall = timelines
+    return ClockComparison(
+        [text for _, _, text in virtual] == [text for _, _, text in wall],
+        max(
+            (abs(v[0] - w[0]) for v, w in zip(virtual, wall)), default=0
+        ),
+        cycles
+    )
+
+
+if __name__ == '__main__':
+    print(simulate())
+    print(compare_clocks())
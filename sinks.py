@@ -0,0 +1,195 @@
+import abc
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter, namedtuple
+from email.message import EmailMessage
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_QUEUE_SIZE = 1000
+
+Notification = namedtuple(
+    'Notification', ('chat_id', 'text', 'homework', 'created')
+)
+
+
+def make_notification(chat_id, text, homework=None):
+    return Notification(chat_id, text, homework, time.time())
+
+
+class Sink(abc.ABC):
+    """Destination of status notifications.
+
+    `deliver` runs in the own thread of the sink and passes `timeout` to
+    its network or disk calls, so a slow sink delays only itself.
+    """
+
+    name = 'sink'
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    @abc.abstractmethod
+    def deliver(self, notification):
+        """Deliver notification or raise."""
+
+
+class TelegramSink(Sink):
+    """Copy of notifications in another Telegram chat, e.g. a channel."""
+
+    name = 'telegram'
+
+    def __init__(self, bot, chat_id=None, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.bot = bot
+        self.chat_id = chat_id
+
+    def deliver(self, notification):
+        self.bot.send_message(
+            self.chat_id or notification.chat_id, notification.text,
+            timeout=self.timeout
+        )
+
+
+class WebhookSink(Sink):
+    name = 'webhook'
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.url = url
+
+    def deliver(self, notification):
+        response = requests.post(
+            self.url, json=notification._asdict(), timeout=self.timeout
+        )
+        response.raise_for_status()
+
+
+class EmailSpoolSink(Sink):
+    """Writes messages as .eml files for a mail transfer agent."""
+
+    name = 'email'
+
+    def __init__(self, directory, sender='homework-bot@localhost',
+                 recipient='student@localhost', timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.directory = directory
+        self.sender = sender
+        self.recipient = recipient
+        os.makedirs(directory, exist_ok=True)
+
+    def deliver(self, notification):
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = self.recipient
+        message['Subject'] = 'Статус проверки домашней работы'
+        message.set_content(notification.text)
+        name = f'{time.time_ns()}-{threading.get_ident()}.eml'
+        temporary = os.path.join(self.directory, f'.{name}.tmp')
+        with open(temporary, 'wb') as file:
+            file.write(message.as_bytes())
+        os.replace(temporary, os.path.join(self.directory, name))
+
+
+class AuditLogSink(Sink):
+    name = 'audit'
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout)
+        self.path = path
+
+    def deliver(self, notification):
+        line = json.dumps(notification._asdict(), ensure_ascii=False)
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+class FanOut:
+    """Deliver every notification to all sinks concurrently.
+
+    Each sink has its own bounded queue and worker thread. `publish`
+    never blocks: when the queue of a sink is full the notification is
+    dropped for that sink only and counted in `stats`.
+    """
+
+    _STOP = object()
+
+    def __init__(self, sinks, queue_size=DEFAULT_QUEUE_SIZE):
+        self.sinks = list(sinks)
+        self.stats = Counter()
+        self._queues = {}
+        self._workers = []
+        for sink in self.sinks:
+            sink_queue = queue.Queue(queue_size)
+            self._queues[sink.name] = sink_queue
+            worker = threading.Thread(
+                target=self._work, args=(sink, sink_queue),
+                name=f'sink-{sink.name}', daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def publish(self, notification):
+        for sink in self.sinks:
+            try:
+                self._queues[sink.name].put_nowait(notification)
+            except queue.Full:
+                self.stats[(sink.name, 'dropped')] += 1
+                logger.warning(f'Sink {sink.name} is full, message dropped')
+
+    def _work(self, sink, sink_queue):
+        while True:
+            notification = sink_queue.get()
+            if notification is self._STOP:
+                return
+            started = time.monotonic()
+            try:
+                sink.deliver(notification)
+            except Exception as error:
+                self.stats[(sink.name, 'failed')] += 1
+                logger.error(f'Sink {sink.name} failed: {error}')
+            else:
+                self.stats[(sink.name, 'delivered')] += 1
+            if time.monotonic() - started > sink.timeout:
+                self.stats[(sink.name, 'slow')] += 1
+
+    def close(self, timeout=None):
+        """Deliver queued notifications and stop the workers."""
+        for sink_queue in self._queues.values():
+            sink_queue.put(self._STOP)
+        for worker in self._workers:
+            worker.join(timeout)
+
+
+def sinks_from_env(environ=os.environ, bot=None):
+    """Sinks listed in NOTIFY_SINKS, e.g. `webhook,email,audit`.
+
+    `telegram` sends copies to `TELEGRAM_SINK_CHAT_ID` through `bot`.
+    """
+    timeout = float(environ.get('SINK_TIMEOUT', DEFAULT_TIMEOUT))
+    factories = {
+        'telegram': lambda: TelegramSink(
+            bot, environ['TELEGRAM_SINK_CHAT_ID'], timeout
+        ),
+        'webhook': lambda: WebhookSink(environ['WEBHOOK_URL'], timeout),
+        'email': lambda: EmailSpoolSink(
+            environ['EMAIL_SPOOL_DIR'], timeout=timeout
+        ),
+        'audit': lambda: AuditLogSink(environ['AUDIT_LOG_FILE'], timeout),
+    }
+    names = [
+        name.strip()
+        for name in environ.get('NOTIFY_SINKS', '').split(',')
+        if name.strip()
+    ]
+    unknown = set(names) - set(factories)
+    if unknown:
+        raise ValueError(f'Unknown notification sinks: {sorted(unknown)}')
+    return [factories[name]() for name in names]
@@ -0,0 +1,259 @@
+import gc
+import json
+import os
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+from telegram.error import NetworkError, RetryAfter
+
+import homework
+from clock import VirtualClock
+from exceptions import (
+    NotCorrectResponseError,
+    RequestError,
+    StatusCodeError,
+    classify_status,
+)
+from scheduler import Scheduler
+from simulation import CountingBot, SimulatedPracticum
+
+DEFAULT_CYCLES = 1_000_000
+TENANTS = 100
+CHANGE_RATE = 0.05
+FAILURE_RATE = 0.05
+WARMUP_SHARE = 0.1
+CHECKPOINTS = 10
+SAMPLE_CYCLES = 1000
+TOLERANCE = 0.1
+GROWTH_SLACK = 0.5
+TOP_SITES = 10
+
+SoakReport = namedtuple('SoakReport', (
+    'tenants', 'cycles', 'seconds', 'steady_memory', 'growth_per_cycle',
+    'allocated_per_cycle', 'top_growth',
+))
+
+
+def failures():
+    """Errors the Practicum stand-in raises, each with a cause."""
+    return (
+        RequestError('Problem with Request', latency=0.5),
+        StatusCodeError(
+            'Status code different to expected: 503', status_code=503,
+            latency=0.1, kind=classify_status(503)
+        ),
+        NotCorrectResponseError('Response is not JSON', latency=0.1),
+    )
+
+
+class FaultyPracticum(SimulatedPracticum):
+    """Simulated API that fails with `failure_rate` share of polls.
+
+    Failures are raised from a cause like in `homework.get_api_answer`,
+    some answers are not a dict and fail the response check.
+    """
+
+    def __init__(self, clock, rng, change_rate, failure_rate):
+        super().__init__(clock, rng, change_rate)
+        self.failure_rate = failure_rate
+
+    def __call__(self, timestamp):
+        if self.rng.random() < self.failure_rate:
+            failure = self.rng.choice(failures() + (None,))
+            if failure is None:
+                return [timestamp]
+            raise failure from ConnectionError('stand-in failure')
+        return super().__call__(timestamp)
+
+
+class FlakyBot(CountingBot):
+    """Counting bot failing with `failure_rate` share of sends."""
+
+    def __init__(self, rng, failure_rate):
+        super().__init__()
+        self.rng = rng
+        self.failure_rate = failure_rate
+
+    def send_message(self, chat_id, text, *args, **kwargs):
+        if self.rng.random() < self.failure_rate:
+            raise self.rng.choice(
+                (NetworkError('Bad Gateway'), RetryAfter(30))
+            )
+        super().send_message(chat_id, text)
+
+
+@contextmanager
+def discarded_logs():
+    """Format and write bot log records, but to /dev/null."""
+    with open(os.devnull, 'w') as devnull:
+        stream = homework.handler.setStream(devnull)
+        try:
+            yield
+        finally:
+            homework.handler.setStream(stream)
+
+
+def slope(points):
+    """Least squares slope of `(x, y)` points."""
+    count = len(points)
+    mean_x = sum(x for x, _ in points) / count
+    mean_y = sum(y for _, y in points) / count
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+class Soak:
+    """Tenants polled through a scheduler on a virtual clock."""
+
+    def __init__(self, tenants, failure_rate, seed):
+        self.clock = VirtualClock()
+        rng = random.Random(seed)
+        self.bot = FlakyBot(random.Random(rng.random()), failure_rate)
+        self.pollers = {
+            tenant: (
+                homework.PollState(0, clock=self.clock, tenant=tenant),
+                FaultyPracticum(self.clock, random.Random(rng.random()),
+                                CHANGE_RATE, failure_rate),
+            )
+            for tenant in range(tenants)
+        }
+        self.scheduler = Scheduler(self.clock, 0.1, random.Random(seed))
+        self.cycles = 0
+
+    def run(self, cycles):
+        """Run about `cycles` cycles, return how many were run."""
+        period = homework.RETRY_PERIOD * 1.05 / len(self.pollers)
+        done = homework.run_scheduled(
+            self.bot, self.pollers, self.scheduler,
+            until=self.clock.monotonic() + cycles * period
+        )
+        self.cycles += done
+        return done
+
+    def allocated_per_cycle(self, cycles):
+        """Mean peak of memory allocated by one cycle, tracemalloc on."""
+        total = 0
+        states = list(self.pollers.values())
+        for number in range(cycles):
+            state, fetch = states[number % len(states)]
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            homework.process_cycle(self.bot, state, fetch)
+            total += tracemalloc.get_traced_memory()[1] - before
+        return total / cycles
+
+
+def top_growth(before, after, limit=TOP_SITES):
+    """Source lines holding most memory allocated between snapshots."""
+    ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    )
+    stats = after.filter_traces(ignored).compare_to(
+        before.filter_traces(ignored), 'lineno'
+    )
+    return [
+        (f'{os.path.relpath(stat.traceback[0].filename)}:'
+         f'{stat.traceback[0].lineno}',
+         stat.size_diff, stat.count_diff)
+        for stat in stats[:limit] if stat.size_diff > 0
+    ]
+
+
+def soak(cycles=DEFAULT_CYCLES, tenants=TENANTS,
+         failure_rate=FAILURE_RATE, seed=0):
+    """Memory of a long polling run with failing API and bot.
+
+    After a warm-up of `WARMUP_SHARE` cycles memory is traced: steady
+    memory is what is left allocated at the end, growth per cycle is the
+    slope of traced memory over `CHECKPOINTS`, allocation per cycle is
+    the mean peak a single cycle allocates.
+    """
+    run = Soak(tenants, failure_rate, seed)
+    started = time.monotonic()
+    with discarded_logs():
+        run.run(int(cycles * WARMUP_SHARE))
+        gc.collect()
+        tracemalloc.start()
+        try:
+            first = tracemalloc.take_snapshot()
+            done = 0
+            points = [(0, tracemalloc.get_traced_memory()[0])]
+            for _ in range(CHECKPOINTS):
+                done += run.run(cycles // CHECKPOINTS)
+                points.append((done, tracemalloc.get_traced_memory()[0]))
+            gc.collect()
+            last = tracemalloc.take_snapshot()
+            steady = tracemalloc.get_traced_memory()[0]
+            allocated = run.allocated_per_cycle(
+                min(SAMPLE_CYCLES, max(cycles // 10, 1))
+            )
+        finally:
+            tracemalloc.stop()
+    return SoakReport(
+        tenants=tenants,
+        cycles=run.cycles,
+        seconds=time.monotonic() - started,
+        steady_memory=steady,
+        growth_per_cycle=slope(points),
+        allocated_per_cycle=allocated,
+        top_growth=top_growth(first, last),
+    )
+
+
+def save_baseline(report, path):
+    baseline = {
+        name: getattr(report, name) for name in (
+            'tenants', 'cycles', 'steady_memory', 'growth_per_cycle',
+            'allocated_per_cycle',
+        )
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baseline, file, indent=2)
+        file.write('\n')
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def regressions(report, baseline, tolerance=TOLERANCE):
+    """Metrics above the baseline, as `(name, value, limit)`.
+
+    Caches fill during a run, so only a run of the same size is
+    comparable. Growth per cycle gets `GROWTH_SLACK` bytes on top, its
+    baseline is close to zero.
+    """
+    if report.tenants != baseline['tenants'] or (
+        abs(report.cycles - baseline['cycles'])
+        > baseline['cycles'] * tolerance
+    ):
+        raise ValueError(
+            f'Baseline is recorded for {baseline["tenants"]} tenants '
+            f'and {baseline["cycles"]} cycles'
+        )
+    limits = {
+        'steady_memory': baseline['steady_memory'] * (1 + tolerance),
+        'allocated_per_cycle': (
+            baseline['allocated_per_cycle'] * (1 + tolerance)
+        ),
+        'growth_per_cycle': (
+            max(baseline['growth_per_cycle'], 0.0) * (1 + tolerance)
+            + GROWTH_SLACK
+        ),
+    }
+    return [
+        (name, getattr(report, name), limit)
+        for name, limit in limits.items()
+        if getattr(report, name) > limit
+    ]
+
+
+if __name__ == '__main__':
+    print(soak())
@@ -0,0 +1,161 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+from collections import namedtuple
+from contextlib import contextmanager
+
+MAGIC = b'HWSC'
+VERSION = 1
+DEFAULT_CAPACITY = 4096
+HEADER = struct.Struct('<4sII')
+HEADER_SIZE = 64
+SEQUENCE = struct.Struct('<Q')
+SLOT = struct.Struct('<QQdd24s16s64s')
+EMPTY = 0
+READ_ATTEMPTS = 100_000
+
+CachedStatus = namedtuple(
+    'CachedStatus',
+    ('tenant', 'homework_name', 'status', 'updated', 'checked')
+)
+
+
+def tenant_key(tenant):
+    """Non-zero 64-bit key of tenant id."""
+    key = int.from_bytes(
+        hashlib.blake2b(str(tenant).encode(), digest_size=8).digest(),
+        'little'
+    )
+    return key or 1
+
+
+def clip(text, size):
+    return str(text).encode()[:size].decode(errors='ignore').encode()
+
+
+def text(field):
+    return field.rstrip(b'\0').decode() or None
+
+
+@contextmanager
+def locked(file):
+    fcntl.flock(file, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class StatusCache:
+    """Latest status per tenant in a memory-mapped file.
+
+    Any process maps the file and reads a tenant without IPC. Slots are
+    found by open addressing on a hash of the tenant id. Each slot has a
+    seqlock: the writer makes the sequence odd, writes the fields and
+    makes it even again; a reader retries until it sees the same even
+    sequence before and after copying the slot. The single writer of a
+    tenant is the worker holding its lease, so only claiming a free slot
+    takes a file lock.
+    """
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self._file = open(path, 'a+b')
+        with locked(self._file):
+            if os.fstat(self._file.fileno()).st_size == 0:
+                self._file.write(
+                    HEADER.pack(MAGIC, VERSION, capacity).ljust(HEADER_SIZE)
+                    + bytes(capacity * SLOT.size)
+                )
+                self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self.capacity = HEADER.unpack_from(self._map)
+        if (magic, version) != (MAGIC, VERSION):
+            raise ValueError(f'{path} is not a status cache file')
+        self._slots = {}
+
+    def _offset(self, slot):
+        return HEADER_SIZE + slot * SLOT.size
+
+    def _find(self, key, claim=False):
+        """Slot of key, claimed under file lock if absent and `claim`."""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        start = key % self.capacity
+        for step in range(self.capacity):
+            slot = (start + step) % self.capacity
+            offset = self._offset(slot) + SEQUENCE.size
+            found = SEQUENCE.unpack_from(self._map, offset)[0]
+            if found == key:
+                self._slots[key] = slot
+                return slot
+            if found == EMPTY:
+                if not claim:
+                    return None
+                with locked(self._file):
+                    if SEQUENCE.unpack_from(self._map, offset)[0] == EMPTY:
+                        SEQUENCE.pack_into(self._map, offset, key)
+                        self._slots[key] = slot
+                        return slot
+                return self._find(key, claim)
+        if claim:
+            raise OverflowError(f'Status cache {self.path} is full')
+        return None
+
+    def publish(self, tenant, checked, homework_name=None, status=None,
+                updated=None):
+        """Write tenant status; without `homework_name` only `checked`."""
+        key = tenant_key(tenant)
+        slot = self._find(key, claim=True)
+        offset = self._offset(slot)
+        fields = SLOT.unpack_from(self._map, offset)
+        sequence = fields[0]
+        if homework_name is None:
+            updated, status, name = fields[2], fields[5], fields[6]
+        else:
+            name, status = clip(homework_name, 64), clip(status or '', 16)
+            updated = updated or 0.0
+        SEQUENCE.pack_into(self._map, offset, sequence + 1)
+        SLOT.pack_into(self._map, offset, sequence + 1, key, updated,
+                       checked, clip(tenant, 24), status, name)
+        SEQUENCE.pack_into(self._map, offset, sequence + 2)
+
+    def read(self, tenant):
+        """Consistent copy of tenant status or None if it is unknown."""
+        slot = self._find(tenant_key(tenant))
+        if slot is None:
+            return None
+        return self._read_slot(slot)
+
+    def _read_slot(self, slot):
+        offset = self._offset(slot)
+        for _ in range(READ_ATTEMPTS):
+            before = SEQUENCE.unpack_from(self._map, offset)[0]
+            if before & 1:
+                os.sched_yield()
+                continue
+            fields = SLOT.unpack_from(self._map, offset)
+            if SEQUENCE.unpack_from(self._map, offset)[0] == before:
+                break
+        else:
+            raise TimeoutError('Status cache slot is never stable')
+        _, _, updated, checked, tenant, status, name = fields
+        return CachedStatus(
+            text(tenant), text(name), text(status), updated or None, checked
+        )
+
+    def statuses(self):
+        """Statuses of all published tenants."""
+        for slot in range(self.capacity):
+            key = SEQUENCE.unpack_from(
+                self._map, self._offset(slot) + SEQUENCE.size
+            )[0]
+            if key != EMPTY:
+                yield self._read_slot(slot)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
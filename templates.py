@@ -0,0 +1,135 @@
+import json
+from string import Formatter
+
+MESSAGE = 'message'
+VERDICTS = 'verdicts'
+
+BUILTIN_LOCALES = {
+    'en': {
+        MESSAGE: 'Review status of "{homework_name}" has changed. {verdict}',
+        VERDICTS: {
+            'approved': 'The reviewer liked everything. Hooray!',
+            'reviewing': 'The reviewer has started checking it.',
+            'rejected': 'The reviewer has comments.',
+        },
+    },
+}
+
+
+def merge_locales(base, overrides):
+    """Locales of `base` with messages and verdicts of `overrides` on top."""
+    merged = dict(base)
+    for name, spec in overrides.items():
+        current = base.get(name, {})
+        merged[name] = {
+            MESSAGE: spec.get(MESSAGE, current.get(MESSAGE)),
+            VERDICTS: {**current.get(VERDICTS, {}),
+                       **spec.get(VERDICTS, {})},
+        }
+        if merged[name][MESSAGE] is None:
+            del merged[name][MESSAGE]
+    return merged
+
+
+class NameTemplate:
+    """Compiled template whose only field left is the homework name.
+
+    Rendering is one f-string of the name and the text around it, so a
+    new name costs as much as a repeated one.
+    """
+
+    __slots__ = ('prefix', 'suffix')
+
+    def __init__(self, prefix, suffix):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def __call__(self, homework_name, homework=None):
+        return f'{self.prefix}{homework_name}{self.suffix}'
+
+
+class FieldTemplate:
+    """Compiled template with fields taken from the homework."""
+
+    __slots__ = ('parts',)
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __call__(self, homework_name, homework=None):
+        values = dict(homework or (), homework_name=homework_name)
+        return ''.join(
+            part if isinstance(part, str)
+            else format(values.get(part[0], ''), part[1])
+            for part in self.parts
+        )
+
+
+def compile_template(template, constants):
+    """Template with `constants` filled in, called with name and homework.
+
+    Fields other than constants are looked up in the homework, missing
+    ones are empty.
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if literal:
+            parts.append(literal)
+        if field is None:
+            continue
+        if conversion:
+            raise ValueError(f'Conversion !{conversion} is not supported')
+        if field in constants:
+            parts.append(format(constants[field], spec))
+        else:
+            parts.append((field, spec))
+    fields = [part for part in parts if isinstance(part, tuple)]
+    if fields == [('homework_name', '')]:
+        at = parts.index(fields[0])
+        return NameTemplate(''.join(parts[:at]), ''.join(parts[at + 1:]))
+    return FieldTemplate(parts)
+
+
+class Renderer:
+    """Status messages from per-locale templates, each compiled once.
+
+    A locale has a `message` template and `verdicts` per status; what a
+    locale lacks is taken from the default one. `tables` holds compiled
+    templates per locale and status.
+    """
+
+    def __init__(self, locales, default):
+        self.default = default
+        self.tables = {}
+        base = locales[default]
+        for locale, spec in locales.items():
+            message = spec.get(MESSAGE, base[MESSAGE])
+            verdicts = {**base[VERDICTS], **spec.get(VERDICTS, {})}
+            self.tables[locale] = {
+                status: compile_template(
+                    message, {'verdict': verdict, 'status': status}
+                )
+                for status, verdict in verdicts.items()
+            }
+
+    def table(self, locale=None):
+        """Templates by status, of the default locale if it is unknown."""
+        return self.tables.get(locale) or self.tables[self.default]
+
+    def render(self, homework_name, status, locale=None, homework=None):
+        """Text of status, a name-only template is joined in place.
+
+        It costs as much as the f-string `parse_status` used before, also
+        for names never seen, as nothing is cached per name.
+        """
+        tables = self.tables
+        template = (tables.get(locale) or tables[self.default])[status]
+        if template.__class__ is NameTemplate:
+            return f'{template.prefix}{homework_name}{template.suffix}'
+        return template(homework_name, homework)
+
+
+def load_locales(path):
+    """Locales of JSON file with `message` and `verdicts` of each locale."""
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
@@ -3,6 +3,21 @@ import string
 from datetime import datetime
 
 import pytest
+from telegram.error import NetworkError
+
+
+class StubBot:
+    """Bot keeping texts it sends, the first `failures` sends fail."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send_message(self, chat_id, text, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise NetworkError('Bad Gateway')
+        self.sent.append(text)
 
 
 @pytest.fixture
@@ -42,3 +57,8 @@ def data_with_new_hw_status(random_timestamp):
         ],
         'current_date': random_timestamp
     }
+
+
+@pytest.fixture
+def bot():
+    return StubBot()
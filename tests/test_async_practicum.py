@@ -0,0 +1,64 @@
+import asyncio
+import socket
+
+import pytest
+
+from benchmarks.standins import PracticumStandIn
+from exceptions import RequestError, StatusCodeError
+
+pytest.importorskip(
+    'httpx', reason='needs pip install -r requirements-async.txt'
+)
+
+from async_practicum import AsyncPracticum  # noqa: E402
+
+
+@pytest.fixture
+def stand_in():
+    with PracticumStandIn() as server:
+        yield server
+
+
+def poll(client, *args):
+    async def request():
+        async with client:
+            return await client.get_api_answer(*args)
+    return asyncio.run(request())
+
+
+def test_answer_since_from_date(stand_in):
+    client = AsyncPracticum(stand_in.endpoint, stand_in.headers)
+    answer = poll(client, 0)
+    assert answer['homeworks'][0]['homework_name'] == 'stand_in__hw.zip'
+    assert isinstance(answer['current_date'], int)
+
+
+def test_rejected_token_is_permanent(stand_in):
+    client = AsyncPracticum(stand_in.endpoint, {'Authorization': 'OAuth x'})
+    with pytest.raises(StatusCodeError) as error:
+        poll(client, 0)
+    assert error.value.status_code == 401
+    assert error.value.kind == 'permanent'
+
+
+def test_network_failure_is_request_error():
+    with socket.socket() as closed:
+        closed.bind(('127.0.0.1', 0))
+        port = closed.getsockname()[1]
+    client = AsyncPracticum(f'http://127.0.0.1:{port}/', {}, timeout=1)
+    with pytest.raises(RequestError, match='Problem with Request'):
+        poll(client, 0)
+
+
+def test_poll_many_keeps_failures_per_tenant(stand_in):
+    async def run():
+        client = AsyncPracticum(stand_in.endpoint, stand_in.headers)
+        async with client:
+            return await client.poll_many(
+                {'a': 0, 'b': 100, 'c': 0},
+                headers={'c': {'Authorization': 'OAuth wrong'}},
+            )
+    answers = asyncio.run(run())
+    assert len(answers['a']['homeworks']) == 1
+    assert answers['b']['homeworks'] == []
+    assert isinstance(answers['c'], StatusCodeError)
@@ -0,0 +1,135 @@
+import threading
+import time
+
+from backpressure import (
+    COLLAPSED,
+    ERROR_KEY,
+    MAX_SLOWDOWN,
+    REFUSED,
+    SUPERSEDED,
+    Message,
+    SheddingQueue,
+    collapse_errors,
+    notification_pipeline,
+)
+from clock import VirtualClock
+from scheduler import Scheduler
+
+
+def test_queue_supersedes_collapses_and_refuses():
+    queue = SheddingQueue(
+        2, key=lambda message: message.key, merge=collapse_errors
+    )
+    assert queue.put(Message(1, 'hw', 'reviewing', 1)) is None
+    assert queue.put(Message(1, 'hw', 'approved', 1)) == SUPERSEDED
+    assert queue.put(Message(1, ERROR_KEY, 'error', 1)) is None
+    assert queue.put(Message(1, ERROR_KEY, 'error', 1)) == COLLAPSED
+    assert queue.put(Message(1, 'hw2', 'rejected', 1)) == REFUSED
+    assert len(queue) == 2
+    assert queue.get(0).text == 'approved'
+    assert queue.get(0).count == 2
+    assert queue.get(0) is None
+    assert queue.put(Message(1, 'hw2', 'rejected', 1)) is None
+
+
+def test_overloaded_pipeline_stays_bounded_and_slows_polling(
+        homework_module):
+    release = threading.Event()
+    sent = []
+
+    def send(tenant, text):
+        release.wait(1)
+        sent.append((tenant, text))
+
+    pipeline = notification_pipeline(send, maxsize=10).start()
+    statuses = ['reviewing', 'rejected'] * 100 + ['approved']
+    for status in statuses:
+        pipeline.submit(('alice', {
+            'homeworks': [{'homework_name': 'hw1', 'status': status}],
+            'current_date': 0,
+        }))
+    for _ in range(30):
+        pipeline.submit(('bob', {'current_date': 0}))
+    accepted = sum(
+        pipeline.submit((student, {
+            'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+            'current_date': 0,
+        })) is None
+        for student in range(50)
+    )
+    deadline = time.monotonic() + 0.5
+    while pipeline.pressure() < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    for _, _, queue in pipeline.stages:
+        assert len(queue) <= 10
+    assert pipeline.delay(600) == 600 * MAX_SLOWDOWN
+    release.set()
+    assert pipeline.wait_idle(1)
+    pipeline.stop()
+
+    alice = [text for tenant, text in sent if tenant == 'alice']
+    bob = [text for tenant, text in sent if tenant == 'bob']
+    assert alice[-1].endswith(homework_module.HOMEWORK_VERDICTS['approved'])
+    assert len(alice) < len(statuses)
+    assert len(bob) <= 2
+    assert len(sent) == len(alice) + len(bob) + accepted
+    assert pipeline.shed()[('validate', REFUSED)] == 50 - accepted > 0
+    assert pipeline.delay(600) == 600
+
+
+def test_scheduled_polling_slows_down_under_pressure(homework_module):
+    clock = VirtualClock()
+    sent = []
+
+    def fetcher(tenant):
+        def fetch(timestamp):
+            return {'homeworks': [{'homework_name': f'hw{tenant}',
+                                   'status': 'approved'}],
+                    'current_date': int(clock.time())}
+        return fetch
+
+    pollers = {
+        tenant: (homework_module.PollState(0, clock=clock), fetcher(tenant))
+        for tenant in range(10)
+    }
+    pipeline = notification_pipeline(
+        lambda tenant, text: sent.append(tenant), maxsize=4, pollers=pollers
+    )
+    done = homework_module.run_scheduled(
+        None, pollers, Scheduler(clock, jitter=0),
+        until=10 * homework_module.RETRY_PERIOD, pipeline=pipeline
+    )
+    assert done < 10 * 10
+    assert pipeline.shed()[('fetch', REFUSED)] > 0
+    pipeline.start()
+    assert pipeline.wait_idle(1)
+    pipeline.stop()
+    assert sorted(sent) == [0, 1, 2, 3]
+
+
+def test_cursor_moves_only_after_send(homework_module):
+    clock = VirtualClock(1000)
+    approved = {'homework_name': 'hw1', 'status': 'approved'}
+    state = homework_module.PollState(1000, clock=clock)
+    pollers = {'alice': (state, lambda timestamp: {
+        'homeworks': [approved], 'current_date': 1600,
+    })}
+    sent = []
+    failures = [RuntimeError('Bad Gateway')]
+
+    def send(tenant, text):
+        if failures:
+            raise failures.pop()
+        sent.append(text)
+
+    pipeline = notification_pipeline(send, pollers=pollers).start()
+    pipeline.submit('alice')
+    assert pipeline.wait_idle(1)
+    assert (sent, state.cursor.position) == ([], 1000)
+    pipeline.submit('alice')
+    assert pipeline.wait_idle(1)
+    pipeline.submit('alice')
+    assert pipeline.wait_idle(1)
+    pipeline.stop()
+    assert sent == [homework_module.parse_status(approved)]
+    assert state.cursor.position == 1600
@@ -0,0 +1,70 @@
+import pytest
+
+from benchmarks.bench_chaos import SCENARIOS, recovery_of, run_scenario
+from benchmarks.standins import FaultPlan, fail, spike
+
+CYCLES = 6
+
+
+def test_fault_plan_breaks_requests_in_order():
+    error = fail(503)
+    faults = FaultPlan((None, 1), (error, 2))
+    assert [faults.next() for _ in range(4)] == [None, error, error, None]
+    assert faults.injected == 2
+
+
+def test_recovery_is_measured_from_last_faulted_cycle():
+    cycles = [(0, False, True), (600, True, False), (1200, True, False),
+              (1800, False, True)]
+    assert recovery_of(cycles) == (600, 1)
+    assert recovery_of(cycles[:3]) == (None, None)
+    assert recovery_of([(0, True, True)]) == (0, 0)
+
+
+def test_baseline_delivers_every_status(homework_module):
+    outcome = run_scenario(SCENARIOS['baseline'], CYCLES)
+    assert (outcome.delivered, outcome.lost) == (CYCLES, 0)
+    assert outcome.recovery == 0
+
+
+def test_latency_spike_only_slows_the_loop(homework_module):
+    outcome = run_scenario({'practicum': (spike(0.05), 2)}, CYCLES)
+    assert outcome.delivered == CYCLES
+    assert outcome.recovery == 0
+
+
+@pytest.mark.parametrize('scenario', [
+    'partial bodies', 'malformed json', '401 storm', '5xx storm',
+])
+def test_practicum_failures_retry_after_one_period(homework_module,
+                                                   scenario):
+    outcome = run_scenario(SCENARIOS[scenario], 8)
+    assert outcome.lost == 0
+    assert outcome.recovery_cycles == 1
+    assert outcome.recovery == pytest.approx(
+        homework_module.RETRY_PERIOD, abs=1
+    )
+
+
+def test_throttled_practicum_waits_retry_after(homework_module):
+    outcome = run_scenario(SCENARIOS['429 storm'], CYCLES)
+    assert outcome.recovery == pytest.approx(1800, abs=1)
+
+
+@pytest.mark.parametrize('scenario', ['flood wait', 'telegram 5xx'])
+def test_statuses_not_sent_meanwhile_are_sent_late(homework_module,
+                                                   scenario):
+    outcome = run_scenario(SCENARIOS[scenario], CYCLES)
+    assert (outcome.delivered, outcome.lost) == (CYCLES, 0)
+    assert outcome.recovery_cycles == 1
+
+
+def test_flood_wait_waits_retry_after(homework_module):
+    outcome = run_scenario(SCENARIOS['flood wait'], CYCLES)
+    assert outcome.recovery == pytest.approx(900, abs=1)
+
+
+def test_rejected_bot_token_stops_the_loop(homework_module):
+    outcome = run_scenario(SCENARIOS['telegram 401'], CYCLES)
+    assert outcome.exited
+    assert outcome.cycles == 4
@@ -0,0 +1,66 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from leases import LeaseStore
+from outbox import Outbox
+from test_replay import record_session
+
+
+def run_cli(capsys, *argv):
+    code = cli.main(list(argv))
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_cli_import_is_light():
+    modules = subprocess.run(
+        [sys.executable, '-c',
+         'import sys, cli; print(" ".join(sorted(sys.modules)))'],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    for heavy in ('homework', 'telegram', 'requests'):
+        assert heavy not in modules
+
+
+def test_unknown_benchmark_is_rejected():
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(['bench', 'nope'])
+
+
+def test_replay_command(tmp_path, capsys, homework_module, bot):
+    path = tmp_path / 'session.jsonl'
+    record_session(homework_module, path, bot)
+    code, report = run_cli(capsys, 'replay', str(path))
+    assert code == 0
+    assert report['sent'] == report['expected'] == 3
+    assert report['mismatches'] == []
+
+
+def test_inspect_command(tmp_path, capsys):
+    outbox = Outbox(str(tmp_path / 'outbox.jsonl'))
+    outbox.put('a', 1, 'first')
+    outbox.put('b', 1, 'second')
+    outbox.ack('a')
+    outbox.close()
+    store = LeaseStore(str(tmp_path / 'leases.db'), owner='replica-1')
+    store.acquire('1')
+    store.claim('b')
+    store.close()
+
+    code, report = run_cli(
+        capsys, 'inspect',
+        '--outbox', str(tmp_path / 'outbox.jsonl'),
+        '--leases', str(tmp_path / 'leases.db'),
+        '--recording', str(tmp_path / 'missing.jsonl'),
+    )
+    assert code == 0
+    assert report['outbox']['pending'] == [
+        {'key': 'b', 'chat_id': 1, 'text': 'second'}
+    ]
+    assert report['outbox']['acked'] == 1
+    assert report['leases']['leases'][0]['owner'] == 'replica-1'
+    assert report['leases']['sent_keys'] == 1
+    assert report['recording'] is None
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from clock import ScaledClock, VirtualClock
+from simulation import SimulatedPracticum, simulate
+
+
+def test_virtual_clock_moves_on_sleep():
+    clock = VirtualClock(100)
+    clock.sleep(600)
+    clock.advance_to(500)
+    assert clock.time() == 700
+    with pytest.raises(ValueError):
+        clock.sleep(-1)
+
+
+def test_scaled_clock_runs_faster():
+    clock = ScaledClock(10000, start=0)
+    clock.sleep(60)
+    assert 60 <= clock.time() < 600
+
+
+def test_run_polling_uses_state_clock(homework_module, bot):
+    clock = VirtualClock()
+    state = homework_module.PollState(0, clock=clock)
+    fetch = SimulatedPracticum(clock, random.Random(1), change_rate=0)
+    done = homework_module.run_polling(bot, state, cycles=144, fetch=fetch)
+    assert done == 144
+    assert clock.time() == 144 * homework_module.RETRY_PERIOD
+
+
+def test_simulated_day_runs_on_virtual_time():
+    report = simulate(tenants=200, days=1)
+    assert report.virtual_seconds == 24 * 60 * 60
+    assert report.cycles == 200 * 144
+    assert report.sent > 0
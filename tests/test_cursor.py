@@ -0,0 +1,137 @@
+import logging
+
+from clock import VirtualClock
+from cursor import DEFAULT_OVERLAP, GAP_AFTER, Cursor, CursorStore
+from exceptions import RequestError
+from scheduler import Scheduler
+
+START = 1_000_000
+
+
+def change(status, date_updated='2026-01-01T10:00:00Z'):
+    return {'id': 7, 'homework_name': 'hw1', 'status': status,
+            'date_updated': date_updated}
+
+
+class Practicum:
+    """Answers in turn, every one stamped with the clock time."""
+
+    def __init__(self, clock, *answers):
+        self.clock = clock
+        self.answers = list(answers)
+        self.from_dates = []
+
+    def __call__(self, timestamp):
+        self.from_dates.append(timestamp)
+        homeworks = self.answers.pop(0)
+        if isinstance(homeworks, Exception):
+            raise homeworks
+        return {'homeworks': homeworks, 'current_date': int(self.clock.time())}
+
+
+def poll(homework_module, bot, state, fetch, cycles):
+    for _ in range(cycles):
+        state.clock.sleep(homework_module.process_cycle(bot, state, fetch))
+
+
+def test_overlap_rereads_window_without_duplicates(homework_module, bot):
+    clock = VirtualClock(START)
+    state = homework_module.PollState(START, clock=clock)
+    practicum = Practicum(
+        clock, [change('reviewing')], [change('reviewing')],
+        [change('approved', '2026-01-01T10:20:00Z')],
+    )
+    poll(homework_module, bot, state, practicum, 3)
+    period = homework_module.RETRY_PERIOD
+    assert practicum.from_dates == [
+        START, START - DEFAULT_OVERLAP, START + period - DEFAULT_OVERLAP,
+    ]
+    assert bot.sent == [
+        homework_module.parse_status(change('reviewing')),
+        homework_module.parse_status(change('approved')),
+    ]
+
+
+def test_failed_send_does_not_move_cursor(homework_module, bot):
+    clock = VirtualClock(START)
+    state = homework_module.PollState(START, clock=clock)
+    practicum = Practicum(clock, [change('reviewing')], [])
+    bot.failures = 1
+    poll(homework_module, bot, state, practicum, 2)
+    assert practicum.from_dates == [START, START]
+    assert bot.sent == [homework_module.parse_status(change('reviewing'))]
+    assert state.cursor.position > START
+
+
+def test_gap_is_caught_up_from_last_position(homework_module, caplog, bot):
+    clock = VirtualClock(START)
+    state = homework_module.PollState(START, clock=clock)
+    outage = [RequestError('Problem with Request')] * 3
+    practicum = Practicum(clock, [], *outage, [change('approved')])
+    with caplog.at_level(logging.WARNING, logger=homework_module.__name__):
+        poll(homework_module, bot, state, practicum, 5)
+    assert set(practicum.from_dates[1:]) == {START - DEFAULT_OVERLAP}
+    assert bot.sent[-1] == homework_module.parse_status(change('approved'))
+    assert any('Caught up' in record.message for record in caplog.records)
+
+
+def test_stored_cursor_resumes_and_catches_up_first(homework_module,
+                                                    tmp_path, bot):
+    path = tmp_path / 'cursors'
+    store = CursorStore(path)
+    cursor = Cursor(START)
+    cursor.remember([change('reviewing')], lambda homework, now: now, START)
+    cursor.commit(START, START)
+    store.save(1, cursor)
+
+    clock = VirtualClock(START + 2 * GAP_AFTER)
+    polled = []
+    pollers = {}
+    for tenant in range(3):
+        state = homework_module.PollState(int(clock.time()), clock=clock)
+        state.cursor = CursorStore(path).load(tenant, state.cursor)
+
+        def fetch(timestamp, tenant=tenant):
+            polled.append((tenant, timestamp))
+            return {'homeworks': [change('reviewing')],
+                    'current_date': int(clock.time())}
+        pollers[tenant] = (state, fetch)
+    homework_module.run_scheduled(
+        bot, pollers, Scheduler(clock, jitter=0), until=clock.time() + 1
+    )
+    assert polled[0] == (1, START - DEFAULT_OVERLAP)
+    assert len(bot.sent) == len(polled) - 1
+
+
+def test_failure_before_queueing_does_not_mark_change_seen(homework_module,
+                                                           monkeypatch, bot):
+    clock = VirtualClock(START)
+    state = homework_module.PollState(START, clock=clock)
+    practicum = Practicum(clock, [change('reviewing')], [change('reviewing')])
+    render = homework_module.parse_status
+    calls = []
+
+    def parse_status(homework):
+        calls.append(homework)
+        if len(calls) == 1:
+            raise ValueError('Template failed')
+        return render(homework)
+    monkeypatch.setattr(homework_module, 'parse_status', parse_status)
+    poll(homework_module, bot, state, practicum, 2)
+    assert practicum.from_dates == [START, START]
+    assert bot.sent[-1] == render(change('reviewing'))
+
+
+def test_store_saves_only_the_changed_tenant(tmp_path):
+    store = CursorStore(tmp_path)
+    store.save(1, Cursor(START, checked=START))
+    other = tmp_path / '2.json'
+    other.write_text('not rewritten', encoding='utf-8')
+    cursor = Cursor(START)
+    cursor.remember([change('approved')], lambda homework, now: now, START)
+    cursor.commit(START + 5, START + 5)
+    store.save(1, cursor)
+    loaded = CursorStore(tmp_path).load(1, Cursor(0))
+    assert (loaded.position, loaded.checked) == (START + 5, START + 5)
+    assert loaded.is_seen(change('approved'))
+    assert other.read_text(encoding='utf-8') == 'not rewritten'
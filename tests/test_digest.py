@@ -0,0 +1,64 @@
+from clock import VirtualClock
+from digest import DigestBuffer, split_digest
+from outbox import Outbox
+
+
+def test_split_digest_respects_limit():
+    messages = ['a' * 40, 'b' * 40, 'c' * 40]
+    chunks = split_digest(messages, limit=90)
+    assert chunks == ['a' * 40 + '\n\n' + 'b' * 40, 'c' * 40]
+    assert all(len(chunk) <= 90 for chunk in chunks)
+
+
+def test_split_digest_truncates_long_message():
+    chunks = split_digest(['x' * 200], limit=50)
+    assert len(chunks) == 1
+    assert len(chunks[0]) == 50
+
+
+def test_buffer_waits_for_window():
+    digest = DigestBuffer(window=600)
+    digest.add(1, 'hw1', 'first', now=0)
+    digest.add(1, 'hw2', 'second', now=300)
+    assert digest.pop_due(now=599) == []
+    assert digest.pop_due(now=600) == [(1, 'first\n\nsecond', (0, 300))]
+    assert digest.pop_due(now=1200) == []
+
+
+def test_buffer_supersedes_and_skips_delivered():
+    digest = DigestBuffer(window=0)
+    digest.add(1, 'hw1', 'reviewing', now=0)
+    digest.add(1, 'hw1', 'rejected', now=0)
+    assert digest.pop_due(now=0) == [(1, 'rejected', (0,))]
+    assert digest.add(1, 'hw1', 'rejected', now=10) is False
+    assert digest.pop_due(now=10) == []
+
+
+def test_failed_digest_is_resent(homework_module, bot):
+    state = homework_module.PollState(0, clock=VirtualClock())
+    state.digest = DigestBuffer(window=0)
+    homework = {'homework_name': 'hw1', 'status': 'approved'}
+    response = {'homeworks': [homework], 'current_date': 0}
+    bot.failures = 1
+    for _ in range(3):
+        homework_module.process_cycle(bot, state, lambda timestamp: response)
+    assert bot.sent == [homework_module.parse_status(homework)]
+
+
+def test_repeated_digest_text_is_sent_again(homework_module, bot, tmp_path):
+    clock = VirtualClock()
+    state = homework_module.PollState(0, clock=clock)
+    state.digest = DigestBuffer(window=0)
+    state.outbox = Outbox(str(tmp_path / 'outbox.jsonl'), clock=clock)
+    changes = [('reviewing', '2026-01-01T10:00:00Z'),
+               ('rejected', '2026-01-01T11:00:00Z'),
+               ('reviewing', '2026-01-01T12:00:00Z')]
+    for status, date_updated in changes:
+        homework = {'homework_name': 'hw1', 'status': status,
+                    'date_updated': date_updated}
+        homework_module.process_cycle(bot, state, lambda timestamp: {
+            'homeworks': [homework], 'current_date': 0,
+        })
+    state.outbox.close()
+    assert len(bot.sent) == 3
+    assert bot.sent[0] == bot.sent[2]
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+import requests
+import telegram
+
+import utils
+from exceptions import (
+    PERMANENT,
+    RETRYABLE,
+    THROTTLED,
+    AuthorizationError,
+    SendRequestError,
+    StatusCodeError,
+    classify_status,
+)
+
+
+@pytest.mark.parametrize('status_code, kind', [
+    (HTTPStatus.TOO_MANY_REQUESTS, THROTTLED),
+    (HTTPStatus.INTERNAL_SERVER_ERROR, RETRYABLE),
+    (HTTPStatus.REQUEST_TIMEOUT, RETRYABLE),
+    (HTTPStatus.NO_CONTENT, RETRYABLE),
+    (HTTPStatus.UNAUTHORIZED, PERMANENT),
+])
+def test_classify_status(status_code, kind):
+    assert classify_status(status_code) == kind
+
+
+def test_get_api_answer_fills_error_fields(monkeypatch, homework_module):
+    def mock_get(*args, **kwargs):
+        response = utils.MockResponseGET(
+            http_status=HTTPStatus.TOO_MANY_REQUESTS, data={}
+        )
+        response.headers = {'Retry-After': '120'}
+        return response
+
+    monkeypatch.setattr(requests, 'get', mock_get)
+    with pytest.raises(StatusCodeError) as excinfo:
+        homework_module.get_api_answer(0)
+    error = excinfo.value
+    assert error.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert error.retry_after == 120
+    assert error.throttled
+    assert error.latency >= 0
+
+
+@pytest.mark.parametrize('telegram_error, expected, kind', [
+    (telegram.error.Unauthorized('bad'), AuthorizationError, PERMANENT),
+    (telegram.error.BadRequest('bad'), SendRequestError, PERMANENT),
+    (telegram.error.RetryAfter(30), SendRequestError, THROTTLED),
+    (telegram.error.TimedOut(), SendRequestError, RETRYABLE),
+])
+def test_send_message_classifies_telegram_errors(
+        telegram_error, expected, kind, homework_module):
+    class Bot:
+        def send_message(self, *args, **kwargs):
+            raise telegram_error
+
+    with pytest.raises(expected) as excinfo:
+        homework_module.send_message(Bot(), 'text')
+    assert excinfo.value.kind == kind
+
+
+def test_retry_delay_respects_retry_after(homework_module):
+    error = SendRequestError(retry_after=3600, kind=THROTTLED)
+    assert homework_module.retry_delay(error) == 3600
+    assert homework_module.retry_delay(ValueError()) == (
+        homework_module.RETRY_PERIOD
+    )
@@ -0,0 +1,103 @@
+import json
+
+from clock import VirtualClock
+from filters import (
+    FILTERED_NAME,
+    FILTERED_QUIET_HOURS,
+    FILTERED_STATUS,
+    SubscriptionFilter,
+    load_filters,
+    quiet_table,
+)
+
+NOON = 12 * 60 * 60
+MIDNIGHT = 0
+
+
+def test_quiet_table_wraps_midnight():
+    table = quiet_table([23, 8])
+    assert table[23] and table[0] and table[7]
+    assert not table[8] and not table[22]
+
+
+def test_reason_checks_every_rule():
+    rules = SubscriptionFilter(
+        statuses=['approved', 'rejected'], quiet_hours=[23, 8],
+        homework_patterns=['*final*']
+    )
+    final = {'homework_name': 'user__final.zip', 'status': 'approved'}
+    assert rules.reason(final, NOON) is None
+    assert rules.reason(dict(final, status='reviewing'),
+                        NOON) == FILTERED_STATUS
+    assert rules.reason(final, MIDNIGHT) == FILTERED_QUIET_HOURS
+    assert rules.reason(dict(final, homework_name='hw1'),
+                        NOON) == FILTERED_NAME
+
+
+def test_utc_offset_shifts_quiet_hours():
+    rules = SubscriptionFilter(quiet_hours=[0, 6], utc_offset=3)
+    assert rules.reason({'status': 'approved'}, 20 * 60 * 60) is None
+    assert rules.reason({'status': 'approved'},
+                        21 * 60 * 60) == FILTERED_QUIET_HOURS
+    assert rules.reason({'status': 'approved'}, 3 * 60 * 60) is None
+
+
+def test_filtered_status_is_neither_rendered_nor_sent(
+        tmp_path, monkeypatch, homework_module):
+    path = tmp_path / 'filters.json'
+    path.write_text(json.dumps({'42': {'statuses': ['approved']}}))
+    rendered = []
+    monkeypatch.setattr(
+        homework_module, 'parse_status',
+        lambda homework: rendered.append(homework) or 'message'
+    )
+    state = homework_module.PollState(0, clock=VirtualClock(NOON),
+                                      tenant='42')
+    state.filter = load_filters(str(path))['42']
+    response = {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'reviewing'}],
+        'current_date': NOON,
+    }
+    homework_module.process_cycle(None, state, lambda timestamp: response)
+    assert rendered == []
+    assert state.filter.counters == {FILTERED_STATUS: 1}
+
+
+def test_quiet_hours_hold_status_until_morning(homework_module, bot):
+    clock = VirtualClock(23 * 60 * 60 + 30 * 60)
+    state = homework_module.PollState(0, clock=clock)
+    state.filter = SubscriptionFilter(quiet_hours=[23, 8])
+    approved = {'homework_name': 'hw1', 'status': 'approved'}
+    answers = [[{'homework_name': 'hw1', 'status': 'reviewing'}],
+               [approved], []]
+    for homeworks in answers:
+        homework_module.process_cycle(bot, state, lambda timestamp: {
+            'homeworks': homeworks, 'current_date': int(clock.time()),
+        })
+        assert bot.sent == []
+        clock.sleep(60 * 60)
+    clock.advance_to(8 * 60 * 60 + 24 * 60 * 60)
+    homework_module.process_cycle(bot, state, lambda timestamp: {
+        'homeworks': [], 'current_date': int(clock.time()),
+    })
+    assert bot.sent == [homework_module.parse_status(approved)]
+    assert state.filter.counters == {FILTERED_QUIET_HOURS: 2}
+    assert state.filter.held == {}
+
+
+def test_held_status_is_kept_until_queued(homework_module, bot):
+    clock = VirtualClock(23 * 60 * 60 + 30 * 60)
+    state = homework_module.PollState(0, clock=clock)
+    state.filter = SubscriptionFilter(quiet_hours=[23, 8])
+    approved = {'homework_name': 'hw1', 'status': 'approved'}
+    reviewing = {'homework_name': 'hw2', 'status': 'reviewing'}
+    for homeworks in ([approved], [reviewing], []):
+        homework_module.process_cycle(bot, state, lambda timestamp: {
+            'homeworks': homeworks, 'current_date': int(clock.time()),
+        })
+        clock.advance_to(8 * 60 * 60 + 24 * 60 * 60)
+    assert bot.sent == [
+        homework_module.parse_status(reviewing),
+        homework_module.parse_status(approved),
+    ]
+    assert state.filter.held == {}
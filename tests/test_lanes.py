@@ -0,0 +1,92 @@
+import pytest
+from telegram.error import BadRequest
+
+from clock import VirtualClock
+from exceptions import RequestError
+from lanes import DIAGNOSTIC, STATUS, Lane, Lanes, LaneStats
+
+HOMEWORK = {'homework_name': 'hw1', 'status': 'approved'}
+
+
+def answer(*homeworks):
+    def fetch(timestamp):
+        return {'homeworks': list(homeworks), 'current_date': timestamp}
+    return fetch
+
+
+def failing(timestamp):
+    raise RequestError('Problem with Request')
+
+
+@pytest.fixture
+def state(homework_module):
+    return homework_module.PollState(0, clock=VirtualClock())
+
+
+def test_error_report_keeps_status_dedup(homework_module, state, bot):
+    for fetch in (answer(HOMEWORK), failing, answer(HOMEWORK)):
+        homework_module.process_cycle(bot, state, fetch)
+    assert len(bot.sent) == 2
+    assert bot.sent[1].startswith('Сбой в работе программы')
+
+
+def test_failed_status_is_sent_before_error_report(homework_module, state,
+                                                   bot):
+    bot.failures = 1
+    before = state.lanes.report()
+    homework_module.process_cycle(bot, state, answer(HOMEWORK))
+    assert bot.sent == []
+    homework_module.process_cycle(bot, state, failing)
+    assert bot.sent[0] == homework_module.parse_status(HOMEWORK)
+    assert bot.sent[1].startswith('Сбой в работе программы')
+    after = state.lanes.report()
+    for lane, event, count in ((STATUS, 'failed', 1), (STATUS, 'sent', 1),
+                               (DIAGNOSTIC, 'sent', 1)):
+        assert after[lane][event] - before[lane][event] == count
+
+
+def test_same_error_is_reported_again_after_recovery(homework_module,
+                                                     state, bot):
+    stats = state.lanes[DIAGNOSTIC].stats
+    duplicates = stats.counts['duplicates']
+    for fetch in (failing, failing, answer(), failing):
+        homework_module.process_cycle(bot, state, fetch)
+    assert len(bot.sent) == 2
+    assert stats.counts['duplicates'] - duplicates == 1
+
+
+def test_rejected_status_does_not_block_later_ones(homework_module, state,
+                                                   bot):
+    rejected = {'homework_name': 'hw0', 'status': 'reviewing'}
+    send = bot.send_message
+
+    def send_message(chat_id, text, **kwargs):
+        if text == homework_module.parse_status(rejected):
+            raise BadRequest('Message text is empty')
+        send(chat_id, text, **kwargs)
+    bot.send_message = send_message
+    homework_module.process_cycle(bot, state, answer(rejected))
+    homework_module.process_cycle(bot, state, lambda timestamp: {
+        'homeworks': [HOMEWORK], 'current_date': 600,
+    })
+    assert bot.sent == [homework_module.parse_status(HOMEWORK)]
+    assert state.lanes[STATUS].queue == []
+    assert state.cursor.position == 600
+
+
+def test_diagnostics_wait_for_statuses_and_quota():
+    clock = VirtualClock()
+    sent = []
+    lanes = Lanes(clock, (
+        Lane(STATUS, stats=LaneStats()),
+        Lane(DIAGNOSTIC, quota=1, fatal=False, size=2, stats=LaneStats()),
+    ))
+    for number in range(3):
+        lanes.put(DIAGNOSTIC, f'error {number}',
+                  lambda number=number: sent.append(f'error {number}'))
+    lanes.put(STATUS, 'status', lambda: sent.append('status'))
+    clock.sleep(5)
+    assert lanes.drain() == 2
+    assert sent == ['status', 'error 1']
+    assert lanes.report()[DIAGNOSTIC]['dropped'] == 1
+    assert lanes.report()[STATUS]['p50'] == pytest.approx(5, rel=0.01)
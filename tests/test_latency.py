@@ -0,0 +1,69 @@
+import json
+import random
+
+from clock import VirtualClock
+from latency import LatencyTracker, QuantileSketch
+from simulation import simulate
+
+
+def test_sketch_quantiles_within_accuracy():
+    rng = random.Random(0)
+    values = sorted(rng.expovariate(1 / 300) for _ in range(10000))
+    sketch = QuantileSketch(accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+    assert len(sketch.buckets) < 1000
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_tracker_counts_breaches_per_tenant(tmp_path):
+    path = tmp_path / 'latency.json'
+    tracker = LatencyTracker(slo=60, path=str(path))
+    for seconds in (10, 20, 90):
+        tracker.observe('a', seconds)
+    tracker.observe('b', -5)
+    tracker.save()
+    report = json.loads(path.read_text())
+    assert report['overall']['count'] == 4
+    assert report['overall']['breaches'] == 1
+    assert report['tenants']['a']['breaches'] == 1
+    assert report['tenants']['b']['max'] == 0
+
+
+def test_latency_measured_from_date_updated(homework_module, bot):
+    clock = VirtualClock(1767225900)
+    state = homework_module.PollState(1767225000, clock=clock)
+    state.latency = LatencyTracker(slo=600)
+    homework_module.process_cycle(bot, state, lambda timestamp: {
+        'homeworks': [{
+            'homework_name': 'hw1', 'status': 'approved',
+            'date_updated': '2026-01-01T00:00:00Z',
+        }],
+        'current_date': 1767225800,
+    })
+    assert state.latency.overall.max == 1767225900 - 1767225600
+
+
+def test_latency_without_date_updated_counts_from_answer(homework_module,
+                                                         bot):
+    clock = VirtualClock(1767225900)
+    state = homework_module.PollState(1767225000, clock=clock)
+    state.latency = LatencyTracker(slo=600)
+    homework_module.process_cycle(bot, state, lambda timestamp: {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+        'current_date': 1767225800,
+    })
+    assert state.latency.overall.max == 1767225900 - 1767225800
+
+
+def test_simulated_latency_follows_poll_interval(homework_module):
+    tracker = LatencyTracker(slo=homework_module.RETRY_PERIOD)
+    simulate(tenants=100, days=1, change_rate=0.2, latency=tracker)
+    median = tracker.overall.quantile(0.5)
+    assert tracker.overall.count > 100
+    assert 0.3 * homework_module.RETRY_PERIOD < median
+    assert median < 0.7 * homework_module.RETRY_PERIOD
+    assert sum(tracker.breaches.values()) == 0
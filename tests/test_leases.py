@@ -0,0 +1,109 @@
+from clock import VirtualClock
+from leases import Heartbeat, LeaseStore, idempotency_key
+from outbox import Outbox
+
+RESPONSE = {
+    'homeworks': [{'homework_name': 'hw1', 'status': 'approved',
+                   'date_updated': '2026-01-01T00:00:00Z'}],
+    'current_date': 1000,
+}
+
+
+def make_stores(path, clock):
+    return (
+        LeaseStore(path, owner='worker.1', ttl=30, clock=clock),
+        LeaseStore(path, owner='worker.2', ttl=30, clock=clock),
+    )
+
+
+def test_lease_fails_over_after_ttl(tmp_path):
+    clock = VirtualClock(1000)
+    first, second = make_stores(str(tmp_path / 'leases.db'), clock)
+    assert first.acquire('tenant')
+    assert not second.acquire('tenant')
+    clock.sleep(20)
+    assert first.acquire('tenant')
+    clock.sleep(31)
+    assert second.acquire('tenant')
+    assert first.holder('tenant') == 'worker.2'
+    second.release('tenant')
+    assert first.holder('tenant') is None
+
+
+def test_claim_is_granted_once(tmp_path):
+    clock = VirtualClock(1000)
+    first, second = make_stores(str(tmp_path / 'leases.db'), clock)
+    key = idempotency_key('tenant', 'hw1', 'approved')
+    assert first.claim(key)
+    assert not second.claim(key)
+    clock.sleep(100)
+    first.forget_sent(older_than=50)
+    assert second.claim(key)
+
+
+def test_heartbeat_forgets_old_sent_keys(tmp_path):
+    clock = VirtualClock(1000)
+    store, _ = make_stores(str(tmp_path / 'leases.db'), clock)
+    store.claim('old')
+    clock.sleep(100)
+    store.claim('new')
+    Heartbeat(store, ['tenant'], keep_sent=50).beat()
+    assert store.sent_count() == 1
+    assert store.holder('tenant') == 'worker.1'
+
+
+def test_failed_send_is_retried(tmp_path, homework_module, bot):
+    clock = VirtualClock(1000)
+    state = homework_module.PollState(0, clock=clock, tenant='tenant')
+    state.leases = make_stores(str(tmp_path / 'leases.db'), clock)[0]
+    bot.failures = 1
+    for _ in range(3):
+        homework_module.process_cycle(bot, state, lambda timestamp: RESPONSE)
+        clock.sleep(600)
+    assert bot.sent == [
+        homework_module.parse_status(RESPONSE['homeworks'][0])
+    ]
+    assert state.leases.sent_count() == 1
+
+
+def test_replicas_do_not_send_twice(tmp_path, homework_module, bot):
+    clock = VirtualClock(1000)
+    response = RESPONSE
+    states = []
+    for store in make_stores(str(tmp_path / 'leases.db'), clock):
+        state = homework_module.PollState(0, clock=clock, tenant='tenant')
+        state.leases = store
+        states.append(state)
+
+    first, second = states
+    homework_module.process_cycle(bot, first, lambda timestamp: response)
+    assert homework_module.process_cycle(
+        bot, second, lambda timestamp: response
+    ) == 30
+    clock.sleep(60)
+    homework_module.process_cycle(bot, second, lambda timestamp: response)
+    assert len(bot.sent) == 1
+
+
+def test_claim_is_given_back_after_outbox_failure(tmp_path,
+                                                  homework_module, bot):
+    clock = VirtualClock(1000)
+    state = homework_module.PollState(0, clock=clock, tenant='tenant')
+    state.leases = make_stores(str(tmp_path / 'leases.db'), clock)[0]
+    state.outbox = Outbox(str(tmp_path / 'outbox.jsonl'), clock=clock)
+    put = state.outbox.put
+    failures = [OSError('No space left on device')]
+
+    def failing_put(*args):
+        if failures:
+            raise failures.pop()
+        return put(*args)
+    state.outbox.put = failing_put
+    for _ in range(2):
+        homework_module.process_cycle(bot, state, lambda timestamp: RESPONSE)
+        clock.sleep(600)
+    state.outbox.close()
+    assert bot.sent[0] == homework_module.parse_status(
+        RESPONSE['homeworks'][0]
+    )
+    assert bot.sent[1].startswith('Сбой в работе программы')
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+from telegram.error import BadRequest
+
+from clock import VirtualClock
+from live import EDITED, QUEUED, SENT, UNCHANGED, LiveMessages
+
+
+class Bot:
+    def __init__(self):
+        self.calls = []
+        self.missing = set()
+
+    def send_message(self, chat_id, text, **kwargs):
+        self.calls.append(('send', text))
+        return SimpleNamespace(message_id=len(self.calls))
+
+    def pin_chat_message(self, chat_id, message_id, **kwargs):
+        self.calls.append(('pin', message_id))
+
+    def unpin_chat_message(self, chat_id, message_id=None, **kwargs):
+        self.calls.append(('unpin', message_id))
+
+    def edit_message_text(self, text, chat_id=None, message_id=None,
+                          **kwargs):
+        if message_id in self.missing:
+            raise BadRequest('Message to edit not found')
+        self.calls.append(('edit', message_id, text))
+
+
+def test_changes_edit_one_pinned_message(tmp_path):
+    path = str(tmp_path / 'live.json')
+    bot = Bot()
+    live = LiveMessages(path, edit_interval=60)
+    assert live.show(bot, 1, 'hw1', 'reviewing', 0) == SENT
+    assert live.show(bot, 1, 'hw1', 'rejected', 100) == EDITED
+    assert bot.calls == [('send', 'reviewing'), ('pin', 1),
+                         ('edit', 1, 'rejected')]
+    assert LiveMessages(path).message_id(1, 'hw1') == 1
+
+
+def test_rapid_changes_are_coalesced():
+    bot = Bot()
+    live = LiveMessages(edit_interval=60)
+    live.show(bot, 1, 'hw1', 'reviewing', 0)
+    assert live.show(bot, 1, 'hw1', 'rejected', 10) == QUEUED
+    assert live.show(bot, 1, 'hw1', 'reviewing', 20) == UNCHANGED
+    assert live.flush(bot, 70) == 0
+    assert live.show(bot, 1, 'hw1', 'rejected', 30) == QUEUED
+    assert live.show(bot, 1, 'hw1', 'reviewing again', 40) == QUEUED
+    assert live.flush(bot, 50) == 0
+    assert live.flush(bot, 61) == 1
+    assert [call for call in bot.calls if call[0] == 'edit'] == [
+        ('edit', 1, 'reviewing again')
+    ]
+
+
+def test_deleted_message_is_posted_again():
+    bot = Bot()
+    live = LiveMessages(edit_interval=0)
+    live.show(bot, 1, 'hw1', 'reviewing', 0)
+    bot.missing.add(1)
+    assert live.show(bot, 1, 'hw1', 'rejected', 10) == SENT
+    assert live.message_id(1, 'hw1') == 3
+
+
+def test_statuses_edit_and_send_approved_as_new(homework_module):
+    bot = Bot()
+    clock = VirtualClock(0)
+    state = homework_module.PollState(0, clock=clock)
+    state.live = LiveMessages(edit_interval=0)
+    for status in ('reviewing', 'rejected', 'reviewing', 'approved'):
+        homework_module.queue_statuses(
+            bot, state, [{'homework_name': 'hw1', 'status': status}],
+            clock.time()
+        )
+        state.lanes.drain()
+        clock.sleep(600)
+    assert [call[0] for call in bot.calls] == [
+        'send', 'pin', 'edit', 'edit', 'unpin', 'send'
+    ]
+    assert state.live.message_id(homework_module.TELEGRAM_CHAT_ID,
+                                 'hw1') is None
@@ -0,0 +1,101 @@
+import errno
+import os
+import threading
+
+import pytest
+
+from clock import VirtualClock
+from exceptions import SendRequestError
+from leases import idempotency_key
+from outbox import Drainer, Outbox
+
+
+def test_unacked_message_survives_restart(tmp_path):
+    path = str(tmp_path / 'outbox.jsonl')
+    clock = VirtualClock(1000)
+    outbox = Outbox(path, clock=clock)
+    assert outbox.put('key-1', 1, 'first')
+    assert outbox.put('key-2', 1, 'second')
+    assert not outbox.put('key-1', 1, 'first')
+    outbox.ack('key-1')
+    outbox.close()
+
+    outbox = Outbox(path, clock=clock)
+    assert list(outbox.pending) == ['key-2']
+    assert not outbox.put('key-1', 1, 'first')
+    sent = []
+    drainer = Drainer(outbox, lambda chat_id, text: sent.append(text))
+    assert drainer.drain() == 1
+    assert sent == ['second']
+    assert not outbox.pending
+    outbox.close()
+
+
+def test_drainer_backs_off_and_drops_permanent(tmp_path):
+    clock = VirtualClock(1000)
+    outbox = Outbox(str(tmp_path / 'outbox.jsonl'), clock=clock,
+                    first_retry=0)
+    outbox.put('key', 1, 'text')
+
+    def send(chat_id, text):
+        raise SendRequestError('Bad Request')
+
+    drainer = Drainer(outbox, send)
+    for _ in range(2):
+        drainer.drain()
+        assert outbox.due() == []
+        clock.sleep(10000)
+    drainer.drain()
+    assert not outbox.pending
+    outbox.close()
+
+
+def test_concurrent_puts_are_all_persisted(tmp_path):
+    path = str(tmp_path / 'outbox.jsonl')
+    outbox = Outbox(path)
+
+    def producer(number):
+        for index in range(50):
+            outbox.put(f'{number}-{index}', number, 'text')
+
+    threads = [
+        threading.Thread(target=producer, args=(number,))
+        for number in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    outbox.close()
+    assert len(Outbox(path).pending) == 400
+
+
+def test_failed_write_raises_instead_of_hanging(tmp_path, monkeypatch):
+    path = str(tmp_path / 'outbox.jsonl')
+    outbox = Outbox(path)
+    fsync = os.fsync
+    failures = [OSError(errno.ENOSPC, 'No space left on device')]
+
+    def flaky_fsync(fd):
+        if failures:
+            raise failures.pop()
+        fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', flaky_fsync)
+    with pytest.raises(OSError):
+        outbox.put('key-1', 1, 'first')
+    assert 'key-1' not in outbox.pending
+    assert outbox.put('key-1', 1, 'first')
+    assert outbox.put('key-2', 1, 'second')
+    outbox.close()
+    assert list(Outbox(path).pending) == ['key-1', 'key-2']
+
+
+def test_pending_message_is_not_reported_delivered(
+        tmp_path, homework_module):
+    clock = VirtualClock(1000)
+    state = homework_module.PollState(0, clock=clock, tenant='tenant')
+    state.outbox = Outbox(str(tmp_path / 'outbox.jsonl'), clock=clock)
+    state.outbox.put(idempotency_key('tenant', 'text'), 1, 'text')
+    assert homework_module.deliver(None, state, 'text') is False
+    state.outbox.close()
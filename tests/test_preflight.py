@@ -0,0 +1,51 @@
+import pytest
+
+import preflight
+from benchmarks.standins import TelegramStandIn
+from exceptions import StatusCodeError
+from transport import pooled_bot
+
+
+def answer(timestamp):
+    return {'homeworks': [], 'current_date': timestamp}
+
+
+def rejected(timestamp):
+    raise StatusCodeError('Status code different to expected: 401',
+                          status_code=401, kind='permanent')
+
+
+@pytest.fixture
+def stand_in():
+    with TelegramStandIn() as server:
+        yield server
+
+
+def test_ready_with_valid_tokens(stand_in, homework_module):
+    bot = pooled_bot(stand_in.token, 2, stand_in.base_url)
+    checks, hosts = homework_module.startup_checks(bot, answer)
+    assert '127.0.0.1' in hosts
+    readiness = preflight.run(checks, ['127.0.0.1'])
+    assert readiness.ready, readiness.checks
+    assert readiness.fatal == []
+    assert homework_module.check_bot(bot) == 'stand_in_bot'
+    assert stand_in.requests == 2
+
+
+def test_rejected_tokens_are_fatal(stand_in, homework_module):
+    bot = pooled_bot('654321:wrong', 2, stand_in.base_url)
+    checks, _ = homework_module.startup_checks(bot, rejected)
+    readiness = preflight.run(checks)
+    assert not readiness.ready
+    assert {check.name for check in readiness.fatal} == {
+        'telegram token', 'telegram chat', 'practicum token'
+    }
+
+
+def test_network_failure_is_not_fatal():
+    def unreachable():
+        raise ConnectionError('no route')
+
+    readiness = preflight.run({'practicum token': unreachable})
+    assert not readiness.ready
+    assert readiness.fatal == []
@@ -0,0 +1,54 @@
+from clock import VirtualClock
+from exceptions import StatusCodeError
+from recorder import REDACTED, Recorder, RecordingBot, redact
+from replay import load_recording, replay
+
+ANSWERS = [
+    {'homeworks': [], 'current_date': 1000},
+    {'homeworks': [{'homework_name': 'hw1', 'status': 'reviewing'}],
+     'current_date': 1600},
+    StatusCodeError('Status code different to expected: 503',
+                    status_code=503),
+    {'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+     'current_date': 2800},
+    {'homeworks': [], 'current_date': 3400},
+]
+
+
+def record_session(homework_module, path, bot):
+    clock = VirtualClock(1000)
+    recorder = Recorder(path, clock=clock, secrets=['sometoken'])
+    bot = RecordingBot(bot, recorder)
+    answers = iter(ANSWERS)
+
+    def fetch(timestamp):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    state = homework_module.PollState(1000, clock=clock)
+    for _ in ANSWERS:
+        homework_module.process_cycle(
+            bot, state, recorder.wrap_fetch(fetch)
+        )
+        clock.sleep(homework_module.RETRY_PERIOD)
+
+
+def test_redact_hides_tokens():
+    text = 'token sometoken and bot 123456:ABCdefGHIjklMNOpqrSTUvwxYZ'
+    assert redact(text, ['sometoken']) == f'token {REDACTED} and bot {REDACTED}'
+
+
+def test_replay_reproduces_recorded_messages(tmp_path, homework_module,
+                                             bot):
+    path = tmp_path / 'session.jsonl'
+    record_session(homework_module, path, bot)
+    records = load_recording(path)
+    assert [record['k'] for record in records].count('send') == 3
+
+    report = replay(path, speed=100000)
+    assert report.cycles == len(ANSWERS)
+    assert report.mismatches == []
+    assert report.virtual_seconds == 4 * homework_module.RETRY_PERIOD
+    assert report.wall_seconds < 1
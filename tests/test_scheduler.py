@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+
+from clock import VirtualClock
+from scheduler import Scheduler
+
+
+def test_due_keys_come_in_order_and_leave():
+    scheduler = Scheduler(VirtualClock(), jitter=0)
+    scheduler.schedule('b', 20)
+    scheduler.schedule('a', 10)
+    scheduler.schedule('c', 30)
+    assert scheduler.pop_due(5) == []
+    assert scheduler.pop_due(25) == ['a', 'b']
+    assert len(scheduler) == 1 and 'c' in scheduler
+
+
+def test_reschedule_and_cancel_replace_the_turn():
+    scheduler = Scheduler(VirtualClock(), jitter=0)
+    for key in range(10):
+        scheduler.schedule(key, 10)
+    scheduler.schedule(3, 100)
+    for key in range(5, 10):
+        assert scheduler.cancel(key)
+    assert not scheduler.cancel(42)
+    assert scheduler.pop_due(50) == [0, 1, 2, 4]
+    assert scheduler.next_due() == 100
+
+
+def test_wait_sleeps_until_earliest_tenant():
+    clock = VirtualClock(1000)
+    scheduler = Scheduler(clock, jitter=0)
+    assert scheduler.wait() == []
+    scheduler.schedule('slow', 600)
+    scheduler.schedule('fast', 60)
+    assert scheduler.wait() == ['fast']
+    assert clock.time() == 1060
+
+
+def test_jitter_stretches_delay_and_spreads_herd():
+    scheduler = Scheduler(VirtualClock(), jitter=0.1, rng=random.Random(0))
+    for key in range(1000):
+        scheduler.schedule(key, 600)
+    moments = [scheduler.next_due()]
+    while scheduler.next_due() is not None:
+        moments.append(scheduler.next_due())
+        scheduler.pop_due(scheduler.next_due())
+    assert 600 <= min(moments) and max(moments) <= 660
+    assert max(Counter(int(moment) for moment in moments).values()) < 50
+
+
+def test_run_scheduled_polls_every_tenant_each_period(homework_module, bot):
+    clock = VirtualClock()
+    polls = Counter()
+
+    def fetcher(tenant):
+        def fetch(timestamp):
+            polls[tenant] += 1
+            return {'homeworks': [], 'current_date': int(clock.time())}
+        return fetch
+
+    pollers = {
+        tenant: (homework_module.PollState(0, clock=clock), fetcher(tenant))
+        for tenant in range(50)
+    }
+    done = homework_module.run_scheduled(
+        bot, pollers, Scheduler(clock, jitter=0),
+        until=10 * homework_module.RETRY_PERIOD
+    )
+    assert done == 500
+    assert set(polls.values()) == {10}
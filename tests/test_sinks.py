@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+
+from telegram.error import NetworkError
+
+from clock import VirtualClock
+from sinks import (
+    AuditLogSink,
+    EmailSpoolSink,
+    FanOut,
+    Sink,
+    make_notification,
+    sinks_from_env,
+)
+
+
+class SlowSink(Sink):
+    name = 'slow'
+
+    def __init__(self):
+        super().__init__(timeout=0.01)
+        self.release = threading.Event()
+
+    def deliver(self, notification):
+        self.release.wait(1)
+
+
+def wait_for(condition, timeout=1):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+def test_slow_sink_does_not_delay_others(tmp_path):
+    slow = SlowSink()
+    audit_path = tmp_path / 'audit.jsonl'
+    spool = tmp_path / 'spool'
+    fanout = FanOut([slow, AuditLogSink(str(audit_path)),
+                     EmailSpoolSink(str(spool))])
+    for number in range(3):
+        fanout.publish(make_notification(1, f'message {number}'))
+
+    assert wait_for(lambda: fanout.stats[('email', 'delivered')] == 3)
+    assert wait_for(lambda: fanout.stats[('audit', 'delivered')] == 3)
+    assert fanout.stats[('slow', 'delivered')] == 0
+    lines = audit_path.read_text().splitlines()
+    assert [json.loads(line)['text'] for line in lines] == [
+        'message 0', 'message 1', 'message 2'
+    ]
+    assert len(list(spool.glob('*.eml'))) == 3
+    slow.release.set()
+    fanout.close(timeout=1)
+    assert fanout.stats[('slow', 'delivered')] == 3
+    assert fanout.stats[('slow', 'slow')] >= 1
+
+
+def test_full_sink_queue_drops_for_that_sink_only():
+    slow = SlowSink()
+    fanout = FanOut([slow], queue_size=1)
+    for number in range(5):
+        fanout.publish(make_notification(1, f'message {number}'))
+    assert fanout.stats[('slow', 'dropped')] >= 3
+    slow.release.set()
+    fanout.close(timeout=1)
+
+
+def test_sinks_from_env(tmp_path):
+    environ = {
+        'NOTIFY_SINKS': 'audit, email',
+        'AUDIT_LOG_FILE': str(tmp_path / 'audit.jsonl'),
+        'EMAIL_SPOOL_DIR': str(tmp_path / 'spool'),
+    }
+    assert [sink.name for sink in sinks_from_env(environ)] == [
+        'audit', 'email'
+    ]
+    assert sinks_from_env({}) == []
+
+
+def test_sinks_do_not_wait_for_telegram(tmp_path, homework_module):
+    class Bot:
+        def send_message(self, chat_id, text, **kwargs):
+            raise NetworkError('Bad Gateway')
+
+    audit = AuditLogSink(str(tmp_path / 'audit.jsonl'))
+    state = homework_module.PollState(0, clock=VirtualClock())
+    state.fanout = FanOut([audit])
+    homework = {'homework_name': 'hw1', 'status': 'approved'}
+    for _ in range(2):
+        homework_module.process_cycle(Bot(), state, lambda timestamp: {
+            'homeworks': [homework], 'current_date': 0,
+        })
+    assert wait_for(lambda: state.fanout.stats[('audit', 'delivered')] == 1)
+    state.fanout.close(timeout=1)
+    assert state.fanout.stats[('audit', 'delivered')] == 1
+
+
+def test_telegram_sink_copies_to_its_chat():
+    sent = []
+
+    class Bot:
+        def send_message(self, chat_id, text, **kwargs):
+            sent.append((chat_id, text))
+
+    environ = {'NOTIFY_SINKS': 'telegram', 'TELEGRAM_SINK_CHAT_ID': '-100'}
+    sink, = sinks_from_env(environ, bot=Bot())
+    sink.deliver(make_notification(1, 'message'))
+    assert sent == [('-100', 'message')]
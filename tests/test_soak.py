@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import cli
+import soak
+
+CYCLES = 1000
+TENANTS = 10
+
+
+def test_soak_reports_memory_of_cycles(homework_module):
+    report = soak.soak(CYCLES, TENANTS)
+    assert report.cycles >= CYCLES
+    assert report.steady_memory > 0
+    assert report.allocated_per_cycle > 0
+    assert all(size > 0 for _, size, _ in report.top_growth)
+
+
+def test_leak_in_hot_path_fails_baseline(homework_module, monkeypatch):
+    baseline = soak.soak(CYCLES, TENANTS)._asdict()
+    kept = []
+    check_response = homework_module.check_response
+
+    def leaking(response):
+        kept.append(bytes(1000))
+        return check_response(response)
+
+    monkeypatch.setattr(homework_module, 'check_response', leaking)
+    leaked = soak.soak(CYCLES, TENANTS)
+    failed = {name for name, _, _ in soak.regressions(leaked, baseline)}
+    assert {'growth_per_cycle', 'steady_memory'} <= failed
+
+
+def test_baseline_of_other_size_is_not_comparable():
+    report = soak.SoakReport(TENANTS, 500, 0, 1, 0, 1, [])
+    baseline = dict(report._asdict(), cycles=CYCLES)
+    with pytest.raises(ValueError):
+        soak.regressions(report, baseline)
+    assert soak.regressions(report, dict(baseline, cycles=500)) == []
+
+
+def test_soak_command_records_and_checks_baseline(tmp_path, capsys,
+                                                  homework_module):
+    path = str(tmp_path / 'baseline.json')
+    argv = ['soak', '--cycles', str(CYCLES), '--tenants', str(TENANTS),
+            '--baseline', path]
+    assert cli.main(argv + ['--record']) == 0
+    capsys.readouterr()
+    assert cli.main(argv) == 0
+    assert json.loads(capsys.readouterr().out)['regressions'] == []
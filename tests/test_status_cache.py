@@ -0,0 +1,86 @@
+import multiprocessing
+
+import pytest
+
+from clock import VirtualClock
+from status_cache import StatusCache
+
+
+def test_status_is_visible_through_other_mapping(tmp_path):
+    path = str(tmp_path / 'status.bin')
+    writer = StatusCache(path, capacity=16)
+    reader = StatusCache(path)
+    assert reader.read(12345) is None
+    writer.publish(12345, 1000.0, 'hw1.zip', 'reviewing', 900.0)
+    assert reader.read(12345) == (
+        '12345', 'hw1.zip', 'reviewing', 900.0, 1000.0
+    )
+    writer.publish(12345, 1600.0)
+    assert reader.read('12345').status == 'reviewing'
+    assert reader.read('12345').checked == 1600.0
+    assert [status.tenant for status in reader.statuses()] == ['12345']
+
+
+def test_full_cache_refuses_new_tenant(tmp_path):
+    cache = StatusCache(str(tmp_path / 'status.bin'), capacity=4)
+    for tenant in range(4):
+        cache.publish(tenant, 0.0, f'hw{tenant}', 'approved')
+    assert {cache.read(tenant).homework_name for tenant in range(4)} == {
+        'hw0', 'hw1', 'hw2', 'hw3'
+    }
+    with pytest.raises(OverflowError):
+        cache.publish(4, 0.0)
+
+
+def write_many(path, count):
+    cache = StatusCache(path)
+    for number in range(1, count + 1):
+        cache.publish('tenant', float(number), f'hw{number}', 'reviewing',
+                      float(number))
+
+
+def test_reader_never_sees_torn_slot(tmp_path):
+    path = str(tmp_path / 'status.bin')
+    reader = StatusCache(path, capacity=16)
+    writer = multiprocessing.get_context('fork').Process(
+        target=write_many, args=(path, 20000)
+    )
+    writer.start()
+    reads = 0
+    while writer.is_alive() or reads == 0:
+        status = reader.read('tenant')
+        if status is not None and status.updated:
+            assert status.homework_name == f'hw{int(status.updated)}'
+            assert status.checked == status.updated
+            reads += 1
+    writer.join()
+    assert reader.read('tenant').homework_name == 'hw20000'
+
+
+def test_poll_publishes_latest_status(tmp_path, homework_module, bot):
+    state = homework_module.PollState(0, clock=VirtualClock(700))
+    state.status_cache = StatusCache(str(tmp_path / 'status.bin'))
+    answer = {'current_date': 600, 'homeworks': [
+        {'homework_name': 'hw2', 'status': 'rejected',
+         'date_updated': '2026-01-01T00:00:00Z'},
+        {'homework_name': 'hw1', 'status': 'approved'},
+    ]}
+    homework_module.process_cycle(bot, state, lambda timestamp: answer)
+    status = state.status_cache.read(state.tenant)
+    assert status.homework_name == 'hw2'
+    assert status.status == 'rejected'
+    assert status.updated == 1767225600
+    assert status.checked == 700
+
+
+def test_full_cache_does_not_stop_notifications(tmp_path, homework_module,
+                                                bot):
+    cache = StatusCache(str(tmp_path / 'status.bin'), capacity=1)
+    cache.publish('other', 0)
+    state = homework_module.PollState(0, clock=VirtualClock(700))
+    state.status_cache = cache
+    homework = {'homework_name': 'hw1', 'status': 'approved'}
+    homework_module.process_cycle(bot, state, lambda timestamp: {
+        'current_date': 600, 'homeworks': [homework],
+    })
+    assert bot.sent == [homework_module.parse_status(homework)]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from templates import Renderer, compile_template
+
+
+def test_parse_status_text_is_unchanged(homework_module):
+    for status, verdict in homework_module.HOMEWORK_VERDICTS.items():
+        for name in ('hw1', 'hw {x}', ''):
+            assert homework_module.parse_status(
+                {'homework_name': name, 'status': status}
+            ) == f'Изменился статус проверки работы "{name}". {verdict}'
+
+
+def test_template_fields_and_escapes():
+    render = compile_template(
+        '{{{homework_name}}} {lesson_name} {status:>9} {reviewer_comment}.',
+        {'status': 'approved'}
+    )
+    assert render('hw1', {'lesson_name': 'Bots'}) == (
+        '{hw1} Bots  approved .'
+    )
+    with pytest.raises(ValueError):
+        compile_template('{homework_name!r}', {})
+
+
+def test_locale_falls_back_to_default():
+    renderer = Renderer({
+        'ru': {'message': '{homework_name}: {verdict}',
+               'verdicts': {'approved': 'да', 'rejected': 'нет'}},
+        'de': {'verdicts': {'approved': 'ja'}},
+    }, 'ru')
+    assert renderer.render('hw1', 'approved', 'de') == 'hw1: ja'
+    assert renderer.render('hw1', 'rejected', 'de') == 'hw1: нет'
+    assert renderer.render('hw1', 'approved', 'xx') == 'hw1: да'
+
+
+def test_tenant_locale_and_custom_templates(tmp_path, monkeypatch,
+                                            homework_module, bot):
+    path = tmp_path / 'templates.json'
+    path.write_text(json.dumps({
+        'ru': {'verdicts': {'approved': 'Принято!'}},
+        'uk': {'message': 'Робота "{homework_name}": {verdict}',
+               'verdicts': {'approved': 'Зараховано.'}},
+    }), encoding='utf-8')
+    monkeypatch.setattr(homework_module, 'RENDERER', homework_module.RENDERER)
+    homework_module.configure_renderer(str(path))
+    approved = [{'homework_name': 'hw1', 'status': 'approved'}]
+
+    for locale in ('en', 'uk', None):
+        state = homework_module.PollState(0, locale=locale)
+        homework_module.queue_statuses(bot, state, approved, 0)
+        state.lanes.drain()
+    assert bot.sent == [
+        'Review status of "hw1" has changed. '
+        'The reviewer liked everything. Hooray!',
+        'Робота "hw1": Зараховано.',
+        'Изменился статус проверки работы "hw1". Принято!',
+    ]
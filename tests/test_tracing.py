@@ -0,0 +1,65 @@
+import json
+import logging
+
+import pytest
+
+import tracing
+from clock import VirtualClock
+
+
+@pytest.fixture
+def tracer(tmp_path):
+    previous = tracing.TRACER
+    yield tracing.configure(str(tmp_path / 'traces.jsonl'), 1.0)
+    tracing.TRACER = previous
+
+
+def run_cycle(homework_module, bot):
+    state = homework_module.PollState(0, clock=VirtualClock())
+    response = {
+        'homeworks': [{'homework_name': 'hw1', 'status': 'approved'}],
+        'current_date': 600,
+    }
+    homework_module.process_cycle(bot, state, lambda timestamp: response)
+
+
+def test_cycle_is_exported_as_one_trace(tracer, homework_module, bot):
+    run_cycle(homework_module, bot)
+    with open(tracer.path) as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 1
+    spans = records[0]['resourceSpans'][0]['scopeSpans'][0]['spans']
+    by_name = {span['name']: span for span in spans}
+    assert set(by_name) == {
+        'poll_cycle', 'check_response', 'parse_status', 'send_message'
+    }
+    root = by_name['poll_cycle']
+    assert 'parentSpanId' not in root
+    for name in ('check_response', 'parse_status', 'send_message'):
+        assert by_name[name]['traceId'] == root['traceId']
+        assert by_name[name]['parentSpanId'] == root['spanId']
+
+
+def test_log_records_carry_trace_id(tracer, homework_module, caplog,
+                                    bot):
+    caplog.handler.addFilter(tracing.TraceIdFilter())
+    with caplog.at_level(logging.INFO):
+        run_cycle(homework_module, bot)
+    sent = [
+        record for record in caplog.records
+        if record.message.startswith('Bot send message')
+    ]
+    assert sent and sent[0].trace_id != tracing.NO_TRACE
+
+
+def test_unsampled_trace_writes_nothing(tmp_path, homework_module, bot):
+    previous = tracing.TRACER
+    tracer = tracing.configure(str(tmp_path / 'traces.jsonl'), 0.0)
+    try:
+        run_cycle(homework_module, bot)
+        assert tracing.trace('cycle') is tracing.NOOP_SPAN
+        assert tracing.span('child') is tracing.NOOP_SPAN
+    finally:
+        tracing.TRACER = previous
+    assert not (tmp_path / 'traces.jsonl').exists()
+    assert tracer.sample_rate == 0.0
@@ -0,0 +1,46 @@
+import threading
+
+from benchmarks.standins import TelegramStandIn
+from transport import ChatDispatcher, chat_worker, pooled_bot
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text, **kwargs):
+        with self.lock:
+            self.sent.append((chat_id, text))
+        return text
+
+
+def test_chat_worker_is_stable():
+    assert chat_worker(12345, 8) == chat_worker('12345', 8)
+    assert 0 <= chat_worker(12345, 8) < 8
+
+
+def test_dispatcher_keeps_order_within_chat():
+    bot = RecordingBot()
+    dispatcher = ChatDispatcher(bot, workers=4)
+    futures = [
+        dispatcher.submit(number % 5, f'{number}') for number in range(100)
+    ]
+    assert [future.result(1) for future in futures] == [
+        f'{number}' for number in range(100)
+    ]
+    dispatcher.close(1)
+    for chat_id in range(5):
+        texts = [int(text) for chat, text in bot.sent if chat == chat_id]
+        assert texts == sorted(texts)
+
+
+def test_pooled_bot_sends_through_stand_in():
+    with TelegramStandIn() as stand_in:
+        bot = pooled_bot(stand_in.token, 2, stand_in.base_url)
+        dispatcher = ChatDispatcher(bot, workers=2)
+        message = dispatcher.submit(42, 'hello').result(1)
+        dispatcher.close(1)
+    assert message.chat_id == 42
+    assert message.text == 'hello'
+    assert stand_in.requests == 1
@@ -0,0 +1,21 @@
+def test_validate_homeworks_collects_every_problem(homework_module):
+    homeworks = [
+        {'homework_name': 'hw1', 'status': 'approved'},
+        ['not', 'a', 'dict'],
+        {'status': 'approved'},
+        {'homework_name': 'hw4'},
+        {'homework_name': 'hw5', 'status': 'unknown'},
+        {'homework_name': 'hw6', 'status': 'reviewing'},
+    ]
+    result = homework_module.validate_homeworks(homeworks)
+    statuses = homework_module.STATUSES
+    assert [
+        (index, name, statuses[code]) for index, name, code in result.valid
+    ] == [(0, 'hw1', 'approved'), (5, 'hw6', 'reviewing')]
+    assert result.errors == [
+        (1, homework_module.NOT_DICT),
+        (2, homework_module.NO_NAME),
+        (3, homework_module.NO_STATUS),
+        (4, homework_module.UNKNOWN_STATUS),
+    ]
+    assert sum(result.counts) == 2
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+SERVICE_NAME = 'homework-bot'
+NO_TRACE = '-'
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current = ContextVar('current_span', default=None)
+
+
+class NoopSpan:
+    """Span of a trace that is not sampled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def attribute_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class Span:
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent', 'name',
+                 'attributes', 'start', 'end', 'error', 'spans', '_token')
+
+    def __init__(self, tracer, name, parent=None):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.trace_id = (
+            parent.trace_id if parent else f'{random.getrandbits(128):032x}'
+        )
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.spans = parent.spans if parent else []
+        self.attributes = {}
+        self.error = None
+        self.start = self.end = None
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.end = time.time_ns()
+        if exc is not None:
+            self.error = repr(exc)
+        _current.reset(self._token)
+        self.spans.append(self)
+        if self.parent is None:
+            self.tracer.export(self.spans)
+        return False
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start),
+            'endTimeUnixNano': str(self.end),
+            'attributes': [
+                {'key': key, 'value': attribute_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            'status': (
+                {'code': STATUS_ERROR, 'message': self.error}
+                if self.error else {'code': STATUS_OK}
+            ),
+        }
+        if self.parent is not None:
+            span['parentSpanId'] = self.parent.span_id
+        return span
+
+
+class Tracer:
+    """Head-sampled tracer exporting OTLP JSON lines to a file.
+
+    The decision is made once per trace, spans of an unsampled trace are
+    a shared no-op object, so tracing costs one context variable lookup
+    per span when sampling is off.
+    """
+
+    def __init__(self, path=None, sample_rate=0.0):
+        self.path = path
+        self.sample_rate = sample_rate if path else 0.0
+        self._lock = threading.Lock()
+
+    def trace(self, name):
+        """Root span of a new trace, no-op if not sampled."""
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name)
+
+    def export(self, spans):
+        record = {'resourceSpans': [{
+            'resource': {'attributes': [{
+                'key': 'service.name',
+                'value': {'stringValue': SERVICE_NAME},
+            }]},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [span.to_otlp() for span in spans],
+            }],
+        }]}
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+TRACER = Tracer(
+    os.getenv('TRACE_FILE'), float(os.getenv('TRACE_SAMPLE_RATE', 0) or 0)
+)
+
+
+def configure(path, sample_rate):
+    global TRACER
+    TRACER = Tracer(path, sample_rate)
+    return TRACER
+
+
+def trace(name):
+    return TRACER.trace(name)
+
+
+def span(name):
+    """Child span of the current span, no-op outside a sampled trace."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.tracer, name, parent)
+
+
+def traced(name):
+    """Decorator wrapping calls in a span."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace_id():
+    current = _current.get()
+    return current.trace_id if current is not None else NO_TRACE
+
+
+class TraceIdFilter(logging.Filter):
+    """Add `trace_id` of the current trace to log records."""
+
+    def filter(self, record):
+        record.trace_id = current_trace_id()
+        return True
@@ -0,0 +1,99 @@
+import logging
+import queue
+import threading
+import zlib
+from concurrent.futures import Future
+
+import telegram
+from telegram.utils.request import Request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 1000
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 10.0
+
+
+def pooled_request(pool_size=DEFAULT_POOL_SIZE,
+                   connect_timeout=CONNECT_TIMEOUT,
+                   read_timeout=READ_TIMEOUT):
+    """Bot API request object keeping `pool_size` connections alive."""
+    return Request(
+        con_pool_size=pool_size,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+    )
+
+
+def pooled_bot(token, pool_size=DEFAULT_POOL_SIZE, base_url=None):
+    """Bot with sized keep-alive connection pool."""
+    return telegram.Bot(
+        token=token, request=pooled_request(pool_size), base_url=base_url
+    )
+
+
+def chat_worker(chat_id, workers):
+    """Stable worker number of a chat."""
+    return zlib.crc32(str(chat_id).encode()) % workers
+
+
+class ChatDispatcher:
+    """Send messages to different chats in parallel.
+
+    All messages of one chat go through the same worker, so they keep the
+    order of `submit` calls. Size the connection pool of the bot to the
+    number of workers, otherwise connections are reopened.
+
+    The polling loop does not use it: every tenant of `run_scheduled`
+    notifies the one `TELEGRAM_CHAT_ID`, which a single worker would
+    serve anyway, and the status lane needs the outcome of a send before
+    the next one. `cli.py --concurrency` only sizes the pool of the bot.
+    """
+
+    _STOP = object()
+
+    def __init__(self, bot, workers=DEFAULT_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE):
+        self.bot = bot
+        self._queues = [queue.Queue(queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(
+                target=self._work, args=(worker_queue,),
+                name=f'telegram-sender-{number}', daemon=True
+            )
+            for number, worker_queue in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, chat_id, text, **kwargs):
+        """Queue message, blocks while the queue of the chat is full."""
+        future = Future()
+        worker = chat_worker(chat_id, len(self._queues))
+        self._queues[worker].put((future, chat_id, text, kwargs))
+        return future
+
+    def _work(self, worker_queue):
+        while True:
+            task = worker_queue.get()
+            if task is self._STOP:
+                return
+            future, chat_id, text, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(
+                    self.bot.send_message(chat_id, text, **kwargs)
+                )
+            except Exception as error:
+                logger.error(f'Message to chat {chat_id} failed: {error}')
+                future.set_exception(error)
+
+    def close(self, timeout=None):
+        """Send queued messages and stop the workers."""
+        for worker_queue in self._queues:
+            worker_queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join(timeout)